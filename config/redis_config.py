@@ -1,29 +1,54 @@
 """Redis connection utilities for the NoSQL portfolio risk analytics project."""
 
 import os
-from typing import Optional
-from redis import Redis
+import socket
+import threading
+from typing import Dict, Optional, Tuple
+
+from redis import ConnectionPool, Redis
+
+# Environment is resolved once at import; it does not change after process start.
+_DEFAULT_REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+_DEFAULT_REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+_DEFAULT_REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+
+# Probe idle sockets so cloud load balancers don't silently drop them.
+# TCP_KEEPIDLE is Linux-only; other platforms fall back to OS defaults.
+_KEEPALIVE_OPTIONS: Dict[int, int] = (
+    {socket.TCP_KEEPIDLE: 30, socket.TCP_KEEPINTVL: 10, socket.TCP_KEEPCNT: 3}
+    if hasattr(socket, "TCP_KEEPIDLE")
+    else {}
+)
+
+# One connection pool per (host, port, db, password, decode_responses); Redis facades
+# are cheap to build.
+_POOLS: Dict[Tuple[str, int, int, Optional[str], bool], ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
 
 
 def get_redis_client(
     host: Optional[str] = None,
     port: Optional[int] = None,
     db: int = 0,
-    password: Optional[str] = None
+    password: Optional[str] = None,
+    decode_responses: bool = True
 ) -> Redis:
     """Return a configured Redis client.
 
     Supports both local and cloud Redis deployments. Connection parameters are
-    read from environment variables if not explicitly provided.
+    read from environment variables (at import time) if not explicitly provided. Clients that
+    resolve to the same connection parameters share one connection pool.
 
     Args:
         host: Redis host name. Defaults to REDIS_HOST env var or "localhost".
         port: Redis TCP port. Defaults to REDIS_PORT env var or 6379.
         db: Redis database index (0-15).
         password: Optional password. Defaults to REDIS_PASSWORD env var.
+        decode_responses: Decode replies to str. Pass False on binary or
+            JSON-parsing paths to receive raw bytes and skip the UTF-8 decode.
 
     Returns:
-        Redis client instance with decode_responses=True.
+        Redis client instance.
 
     Environment Variables:
         REDIS_HOST: Redis server hostname (e.g., redis-12345.c123.redns.redis-cloud.com)
@@ -39,17 +64,34 @@ def get_redis_client(
 
         # Explicit connection
         >>> client = get_redis_client(host="my-redis.cloud.com", port=12345, password="secret")
+
+        # Raw bytes replies
+        >>> client = get_redis_client(decode_responses=False)
     """
-    redis_host = host or os.getenv("REDIS_HOST", "localhost")
-    redis_port = port or int(os.getenv("REDIS_PORT", "6379"))
-    redis_password = password or os.getenv("REDIS_PASSWORD")
-
-    return Redis(
-        host=redis_host,
-        port=redis_port,
-        db=db,
-        password=redis_password,
-        decode_responses=True,
-        socket_connect_timeout=5,
-        socket_timeout=5
-    )
+    redis_host = host or _DEFAULT_REDIS_HOST
+    redis_port = port or _DEFAULT_REDIS_PORT
+    redis_password = password or _DEFAULT_REDIS_PASSWORD
+
+    key = (redis_host, redis_port, db, redis_password, decode_responses)
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    host=redis_host,
+                    port=redis_port,
+                    db=db,
+                    password=redis_password,
+                    decode_responses=decode_responses,
+                    max_connections=32,
+                    socket_connect_timeout=5,
+                    socket_timeout=5,
+                    socket_keepalive=True,
+                    socket_keepalive_options=_KEEPALIVE_OPTIONS,
+                    health_check_interval=30,
+                    retry_on_timeout=True
+                )
+                _POOLS[key] = pool
+
+    return Redis(connection_pool=pool)
@@ -5,11 +5,16 @@ Checks risk metrics against configurable thresholds and generates
 visual alerts for the dashboard.
 """
 
+from __future__ import annotations
+
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+import math
+import types
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple
 
-import pandas as pd
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +29,43 @@ THRESHOLDS = {
     "volatility_high": 0.30,  # Annualized volatility > 30%
 }
 
+# Threshold values and static message suffixes bound once at import
+_VAR_CRIT = THRESHOLDS["var_critical"]
+_VAR_WARN = THRESHOLDS["var_warning"]
+_BETA_HIGH = THRESHOLDS["beta_high"]
+_BETA_WARN = THRESHOLDS["beta_warning"]
+_VOL_HIGH = THRESHOLDS["volatility_high"]
+
+_VAR_CRIT_SUFFIX = f"exceeds critical threshold ({_VAR_CRIT:.2%})"
+_VAR_WARN_SUFFIX = f"exceeds warning threshold ({_VAR_WARN:.2%})"
+_BETA_HIGH_SUFFIX = f"exceeds high threshold ({_BETA_HIGH:.2f})"
+_BETA_WARN_SUFFIX = f"exceeds warning threshold ({_BETA_WARN:.2f})"
+_VOL_HIGH_SUFFIX = f"exceeds threshold ({_VOL_HIGH:.2%})"
+
+# Shared results for the common no-alert paths
+_NONE_RESULT: Tuple[str, str, str] = ("none", "", "")
+_HEALTHY_RESULT: Tuple[str, str, str] = ("healthy", "", "")
+
+# Streamlit color for each severity level
+_SEVERITY_TO_COLOR = {
+    "critical": "red",
+    "warning": "orange",
+    "healthy": "green",
+    "none": "gray"
+}
+
+# Read-only snapshot handed out by get_threshold_info
+_THRESHOLDS_SNAPSHOT = types.MappingProxyType(dict(THRESHOLDS))
+
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    """Active alert produced by evaluate_all_alerts."""
+
+    severity: str
+    type: str
+    message: str
+
 
 def check_var_threshold(var_value: Optional[float]) -> Tuple[str, str, str]:
     """
@@ -36,23 +78,15 @@ def check_var_threshold(var_value: Optional[float]) -> Tuple[str, str, str]:
         Tuple of (severity level, alert type, message)
         Severity: "critical", "warning", "healthy", or "none"
     """
-    if var_value is None:
-        return "none", "", ""
+    if var_value is None or not math.isfinite(var_value):
+        return _NONE_RESULT
 
-    if var_value < THRESHOLDS["var_critical"]:
-        return (
-            "critical",
-            "VaR Critical",
-            f"VaR at {var_value:.2%} exceeds critical threshold ({THRESHOLDS['var_critical']:.2%})"
-        )
-    elif var_value < THRESHOLDS["var_warning"]:
-        return (
-            "warning",
-            "VaR Elevated",
-            f"VaR at {var_value:.2%} exceeds warning threshold ({THRESHOLDS['var_warning']:.2%})"
-        )
+    if var_value < _VAR_CRIT:
+        return "critical", "VaR Critical", f"VaR at {var_value:.2%} {_VAR_CRIT_SUFFIX}"
+    elif var_value < _VAR_WARN:
+        return "warning", "VaR Elevated", f"VaR at {var_value:.2%} {_VAR_WARN_SUFFIX}"
     else:
-        return "healthy", "", ""
+        return _HEALTHY_RESULT
 
 
 def check_beta_threshold(beta_value: Optional[float]) -> Tuple[str, str, str]:
@@ -65,23 +99,15 @@ def check_beta_threshold(beta_value: Optional[float]) -> Tuple[str, str, str]:
     Returns:
         Tuple of (severity level, alert type, message)
     """
-    if beta_value is None:
-        return "none", "", ""
+    if beta_value is None or not math.isfinite(beta_value):
+        return _NONE_RESULT
 
-    if beta_value > THRESHOLDS["beta_high"]:
-        return (
-            "critical",
-            "High Beta",
-            f"Beta at {beta_value:.2f} exceeds high threshold ({THRESHOLDS['beta_high']:.2f})"
-        )
-    elif beta_value > THRESHOLDS["beta_warning"]:
-        return (
-            "warning",
-            "Elevated Beta",
-            f"Beta at {beta_value:.2f} exceeds warning threshold ({THRESHOLDS['beta_warning']:.2f})"
-        )
+    if beta_value > _BETA_HIGH:
+        return "critical", "High Beta", f"Beta at {beta_value:.2f} {_BETA_HIGH_SUFFIX}"
+    elif beta_value > _BETA_WARN:
+        return "warning", "Elevated Beta", f"Beta at {beta_value:.2f} {_BETA_WARN_SUFFIX}"
     else:
-        return "healthy", "", ""
+        return _HEALTHY_RESULT
 
 
 def check_volatility_threshold(vol_value: Optional[float]) -> Tuple[str, str, str]:
@@ -94,17 +120,17 @@ def check_volatility_threshold(vol_value: Optional[float]) -> Tuple[str, str, st
     Returns:
         Tuple of (severity level, alert type, message)
     """
-    if vol_value is None:
-        return "none", "", ""
+    if vol_value is None or not math.isfinite(vol_value):
+        return _NONE_RESULT
 
-    if vol_value > THRESHOLDS["volatility_high"]:
+    if vol_value > _VOL_HIGH:
         return (
             "warning",
             "High Volatility",
-            f"Portfolio volatility at {vol_value:.2%} exceeds threshold ({THRESHOLDS['volatility_high']:.2%})"
+            f"Portfolio volatility at {vol_value:.2%} {_VOL_HIGH_SUFFIX}"
         )
     else:
-        return "healthy", "", ""
+        return _HEALTHY_RESULT
 
 
 def check_sharpe_persistence(historical_df: Optional[pd.DataFrame]) -> Tuple[str, str, str]:
@@ -118,44 +144,48 @@ def check_sharpe_persistence(historical_df: Optional[pd.DataFrame]) -> Tuple[str
         Tuple of (severity level, alert type, message)
     """
     if historical_df is None or historical_df.empty or "Sharpe" not in historical_df.columns:
-        return "none", "", ""
+        return _NONE_RESULT
+
+    # Imported lazily so importing the alert module does not pull in NumPy
+    import numpy as np
+
+    n_days = THRESHOLDS["sharpe_negative_days"]
 
     try:
-        # Get most recent data (last N days)
-        df_recent = historical_df.tail(THRESHOLDS["sharpe_negative_days"])
+        sharpe = historical_df["Sharpe"].to_numpy()
 
-        if len(df_recent) < THRESHOLDS["sharpe_negative_days"]:
+        if sharpe.size < n_days:
             # Not enough data to assess persistence
-            return "none", "", ""
+            return _NONE_RESULT
 
-        # Count negative Sharpe days
-        negative_days = (df_recent["Sharpe"] < 0).sum()
+        # Count negative Sharpe days over the most recent N values
+        negative_days = int(np.count_nonzero(sharpe[-n_days:] < 0))
 
-        if negative_days >= THRESHOLDS["sharpe_negative_days"]:
+        if negative_days >= n_days:
             return (
                 "warning",
                 "Persistent Negative Sharpe",
-                f"Sharpe ratio negative for {negative_days} of last {THRESHOLDS['sharpe_negative_days']} days"
+                f"Sharpe ratio negative for {negative_days} of last {n_days} days"
             )
         # 70% threshold
-        elif negative_days >= THRESHOLDS["sharpe_negative_days"] * 0.7:
+        elif negative_days >= n_days * 0.7:
             return (
                 "warning",
                 "Declining Sharpe",
-                f"Sharpe ratio negative for {negative_days} of last {THRESHOLDS['sharpe_negative_days']} days"
+                f"Sharpe ratio negative for {negative_days} of last {n_days} days"
             )
         else:
-            return "healthy", "", ""
+            return _HEALTHY_RESULT
 
     except Exception as e:
         logger.error(f"Error checking Sharpe persistence: {e}")
-        return "none", "", ""
+        return _NONE_RESULT
 
 
 def evaluate_all_alerts(
     latest_metrics: Optional[Dict],
     historical_df: Optional[pd.DataFrame]
-) -> List[Dict[str, str]]:
+) -> List[Alert]:
     """
     Evaluate all alert conditions and return list of active alerts.
 
@@ -164,7 +194,7 @@ def evaluate_all_alerts(
         historical_df: DataFrame with historical metrics for persistence checks
 
     Returns:
-        List of alert dicts with keys: severity, type, message
+        List of Alert records with fields: severity, type, message
         Sorted by severity (critical first)
     """
     alerts = []
@@ -177,50 +207,132 @@ def evaluate_all_alerts(
     beta_value = latest_metrics.get("beta", {}).get("value")
     vol_value = latest_metrics.get("volatility", {}).get("value")
 
-    # Check VaR threshold
-    severity, alert_type, message = check_var_threshold(var_value)
-    if severity in ["critical", "warning"]:
-        alerts.append({
-            "severity": severity,
-            "type": alert_type,
-            "message": message
-        })
-
-    # Check Beta threshold
-    severity, alert_type, message = check_beta_threshold(beta_value)
-    if severity in ["critical", "warning"]:
-        alerts.append({
-            "severity": severity,
-            "type": alert_type,
-            "message": message
-        })
-
-    # Check Volatility threshold
-    severity, alert_type, message = check_volatility_threshold(vol_value)
-    if severity in ["critical", "warning"]:
-        alerts.append({
-            "severity": severity,
-            "type": alert_type,
-            "message": message
-        })
-
-    # Check Sharpe persistence
-    severity, alert_type, message = check_sharpe_persistence(historical_df)
-    if severity in ["critical", "warning"]:
-        alerts.append({
-            "severity": severity,
-            "type": alert_type,
-            "message": message
-        })
-
-    # Sort by severity (critical first)
-    severity_order = {"critical": 0, "warning": 1}
-    alerts.sort(key=lambda x: severity_order.get(x["severity"], 2))
+    # Run every check in one pass and keep only the active alerts
+    checks = [
+        check_var_threshold(var_value),
+        check_beta_threshold(beta_value),
+        check_volatility_threshold(vol_value),
+    ]
+
+    # History-based checks only run when history is available
+    if historical_df is not None and not historical_df.empty:
+        checks.append(check_sharpe_persistence(historical_df))
+
+    for severity, alert_type, message in checks:
+        if severity in ("critical", "warning"):
+            alerts.append(Alert(severity, alert_type, message))
+
+    # Order by severity (critical first) with a stable two-bucket partition
+    alerts = (
+        [a for a in alerts if a.severity == "critical"]
+        + [a for a in alerts if a.severity == "warning"]
+    )
 
     logger.info(f"Alert evaluation complete: {len(alerts)} active alerts")
     return alerts
 
 
+def evaluate_all_alerts_batch(metrics_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Evaluate alert conditions for every row of a metrics history at once.
+
+    Each row is treated as the "latest" metrics of a replay, with the rows up to
+    and including it as the history, matching evaluate_all_alerts row by row.
+
+    Args:
+        metrics_df: DataFrame with VaR, Beta, Volatility and Sharpe columns
+            (as returned by fetch_historical_metrics); missing columns are skipped
+
+    Returns:
+        DataFrame with columns severity, type, message indexed by the source row
+        label, one row per active alert, critical alerts first within each row
+    """
+    import numpy as np
+    import pandas as pd
+
+    n_rows = len(metrics_df)
+    positions = np.arange(n_rows)
+
+    def _column(name: str) -> np.ndarray:
+        if name not in metrics_df.columns:
+            return np.full(n_rows, np.nan)
+        values = metrics_df[name].to_numpy(dtype=np.float64)
+        return np.where(np.isfinite(values), values, np.nan)
+
+    var_arr = _column("VaR")
+    beta_arr = _column("Beta")
+    vol_arr = _column("Volatility")
+
+    var_crit = var_arr < _VAR_CRIT
+    beta_crit = beta_arr > _BETA_HIGH
+
+    # (mask, severity, alert type, message builder, values) in evaluate_all_alerts order
+    rules = [
+        (var_crit, "critical", "VaR Critical",
+         lambda v: f"VaR at {v:.2%} {_VAR_CRIT_SUFFIX}", var_arr),
+        ((var_arr < _VAR_WARN) & ~var_crit, "warning", "VaR Elevated",
+         lambda v: f"VaR at {v:.2%} {_VAR_WARN_SUFFIX}", var_arr),
+        (beta_crit, "critical", "High Beta",
+         lambda v: f"Beta at {v:.2f} {_BETA_HIGH_SUFFIX}", beta_arr),
+        ((beta_arr > _BETA_WARN) & ~beta_crit, "warning", "Elevated Beta",
+         lambda v: f"Beta at {v:.2f} {_BETA_WARN_SUFFIX}", beta_arr),
+        (vol_arr > _VOL_HIGH, "warning", "High Volatility",
+         lambda v: f"Portfolio volatility at {v:.2%} {_VOL_HIGH_SUFFIX}", vol_arr),
+    ]
+
+    if "Sharpe" in metrics_df.columns:
+        n_days = THRESHOLDS["sharpe_negative_days"]
+        # Rolling count of negative Sharpe values over the trailing n_days rows
+        negative_cum = np.cumsum(metrics_df["Sharpe"].to_numpy(dtype=np.float64) < 0)
+        negative_counts = negative_cum.copy()
+        negative_counts[n_days:] -= negative_cum[:-n_days]
+        has_window = positions >= n_days - 1
+
+        persistent = has_window & (negative_counts >= n_days)
+        declining = has_window & ~persistent & (negative_counts >= n_days * 0.7)
+        sharpe_message = (
+            lambda k: f"Sharpe ratio negative for {int(k)} of last {n_days} days"
+        )
+        rules.append((persistent, "warning", "Persistent Negative Sharpe",
+                      sharpe_message, negative_counts))
+        rules.append((declining, "warning", "Declining Sharpe",
+                      sharpe_message, negative_counts))
+
+    rows, ranks, severities, alert_types, messages = [], [], [], [], []
+    for mask, severity, alert_type, build_message, values in rules:
+        hits = positions[mask]
+        if hits.size == 0:
+            continue
+        rows.append(hits)
+        ranks.append(np.full(hits.size, 0 if severity == "critical" else 1))
+        severities.extend([severity] * hits.size)
+        alert_types.extend([alert_type] * hits.size)
+        messages.extend(build_message(v) for v in values[hits])
+
+    if not rows:
+        return pd.DataFrame(
+            columns=["severity", "type", "message"], index=metrics_df.index[:0]
+        )
+
+    row_idx = np.concatenate(rows)
+    # Stable sort: by source row, then severity, preserving check order
+    order = np.lexsort((np.concatenate(ranks), row_idx))
+
+    alerts_df = pd.DataFrame(
+        {
+            "severity": np.asarray(severities, dtype=object)[order],
+            "type": np.asarray(alert_types, dtype=object)[order],
+            "message": np.asarray(messages, dtype=object)[order],
+        },
+        index=metrics_df.index[row_idx[order]],
+    )
+
+    logger.info(
+        f"Batch alert evaluation complete: {len(alerts_df)} alerts over {n_rows} rows"
+    )
+    return alerts_df
+
+
 def get_alert_color(severity: str) -> str:
     """
     Get color code for alert severity level.
@@ -231,20 +343,14 @@ def get_alert_color(severity: str) -> str:
     Returns:
         Color name for Streamlit styling
     """
-    color_map = {
-        "critical": "red",
-        "warning": "orange",
-        "healthy": "green",
-        "none": "gray"
-    }
-    return color_map.get(severity, "gray")
+    return _SEVERITY_TO_COLOR.get(severity, "gray")
 
 
-def get_threshold_info() -> Dict[str, any]:
+def get_threshold_info() -> Mapping[str, float]:
     """
     Get current threshold configuration for display.
 
     Returns:
-        Dict of threshold names and values
+        Read-only mapping of threshold names and values
     """
-    return THRESHOLDS.copy()
+    return _THRESHOLDS_SNAPSHOT
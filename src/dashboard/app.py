@@ -5,17 +5,21 @@ Real-time and historical risk metric visualization using MongoDB and Redis.
 """
 
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from alerts import evaluate_all_alerts, get_alert_color, get_threshold_info
 from data_queries import (
-    fetch_historical_metrics,
-    fetch_latest_metrics,
+    fetch_dashboard_metrics,
+    clear_dataframe_caches,
     fetch_latest_portfolio_holdings,
     get_available_portfolios,
 )
@@ -26,6 +30,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Historical figures reused across reruns, keyed by DataFrame identity
+FIGURE_CACHE_MAXSIZE = 8
+_FIGURE_CACHE = OrderedDict()
+_FIGURE_CACHE_LOCK = threading.Lock()
+
 # Page configuration
 st.set_page_config(
     page_title="Portfolio Risk Analytics",
@@ -99,22 +108,27 @@ def render_sidebar():
         st.sidebar.error("No portfolios found in database")
         st.stop()
 
-    # Portfolio selector
-    selected_portfolio = st.sidebar.selectbox(
-        "Select Portfolio",
-        portfolios,
-        help="Choose a portfolio to analyze",
-    )
+    # Controls live in a form so slider drags don't rerun the queries; widget
+    # values only change (and trigger a rerun) when Apply is pressed
+    with st.sidebar.form("controls"):
+        # Portfolio selector
+        selected_portfolio = st.selectbox(
+            "Select Portfolio",
+            portfolios,
+            help="Choose a portfolio to analyze",
+        )
 
-    # Date range picker
-    days_back = st.sidebar.slider(
-        "Historical Window (days)",
-        min_value=7,
-        max_value=365,
-        value=60,
-        step=7,
-        help="Number of days to display in historical charts",
-    )
+        # Date range picker
+        days_back = st.slider(
+            "Historical Window (days)",
+            min_value=7,
+            max_value=365,
+            value=60,
+            step=7,
+            help="Number of days to display in historical charts",
+        )
+
+        st.form_submit_button("Apply", use_container_width=True)
 
     # Refresh button
     refresh = st.sidebar.button("🔄 Refresh Data", use_container_width=True)
@@ -143,15 +157,15 @@ def render_alert_banner(alerts):
     Display alert banner with active warnings.
 
     Args:
-        alerts: List of alert dicts from evaluate_all_alerts()
+        alerts: List of Alert records from evaluate_all_alerts()
     """
     if not alerts:
         st.success("✅ All metrics within healthy thresholds")
         return
 
     # Count by severity
-    critical_count = sum(1 for a in alerts if a["severity"] == "critical")
-    warning_count = sum(1 for a in alerts if a["severity"] == "warning")
+    critical_count = sum(1 for a in alerts if a.severity == "critical")
+    warning_count = sum(1 for a in alerts if a.severity == "warning")
 
     if critical_count > 0:
         st.error(f"🚨 {critical_count} Critical Alert(s)")
@@ -160,14 +174,14 @@ def render_alert_banner(alerts):
 
     # Display individual alerts
     for alert in alerts:
-        if alert["severity"] == "critical":
+        if alert.severity == "critical":
             st.markdown(
-                f'<div class="alert-critical"><b>{alert["type"]}</b>: {alert["message"]}</div>',
+                f'<div class="alert-critical"><b>{alert.type}</b>: {alert.message}</div>',
                 unsafe_allow_html=True,
             )
-        elif alert["severity"] == "warning":
+        elif alert.severity == "warning":
             st.markdown(
-                f'<div class="alert-warning"><b>{alert["type"]}</b>: {alert["message"]}</div>',
+                f'<div class="alert-warning"><b>{alert.type}</b>: {alert.message}</div>',
                 unsafe_allow_html=True,
             )
 
@@ -253,15 +267,157 @@ def render_metric_cards(metrics, data_source, latencies):
             st.metric(label="Beta vs SPY (20d)", value="N/A")
 
     # Display timestamp
+    # MongoDB metrics carry a native datetime; Redis metrics an ISO-8601 string
     ts = metrics.get("var", {}).get("ts")
     if ts:
         try:
-            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+            if isinstance(ts, datetime):
+                dt = ts
+            else:
+                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
             st.caption(f"Last updated: {dt.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        except:
+        except (AttributeError, ValueError):
             st.caption(f"Last updated: {ts}")
 
 
+def _build_historical_figures(df):
+    """
+    Build the historical trend figures for every metric column present in df.
+
+    Args:
+        df: DataFrame with historical metrics
+
+    Returns:
+        Dict mapping metric column name to its Plotly figure
+    """
+    figures = {}
+
+    if "VaR" in df.columns:
+        fig_var = go.Figure()
+        fig_var.add_trace(
+            go.Scattergl(
+                x=df["date"],
+                y=df["VaR"],
+                mode="lines+markers",
+                name="VaR 95%",
+                line=dict(color="#f44336", width=2),
+                marker=dict(size=4),
+            )
+        )
+        fig_var.update_layout(
+            title="Value at Risk (95% Confidence)",
+            xaxis_title="Date",
+            yaxis_title="VaR (%)",
+            hovermode="x unified",
+            height=350,
+        )
+        fig_var.update_yaxes(tickformat=".2%")
+        figures["VaR"] = fig_var
+
+    if "Sharpe" in df.columns:
+        fig_sharpe = go.Figure()
+        fig_sharpe.add_trace(
+            go.Scattergl(
+                x=df["date"],
+                y=df["Sharpe"],
+                mode="lines+markers",
+                name="Sharpe Ratio",
+                line=dict(color="#2196f3", width=2),
+                marker=dict(size=4),
+            )
+        )
+        # Add zero reference line
+        fig_sharpe.add_hline(
+            y=0, line_dash="dash", line_color="gray", annotation_text="Zero"
+        )
+        fig_sharpe.update_layout(
+            title="Sharpe Ratio (20-day Rolling)",
+            xaxis_title="Date",
+            yaxis_title="Sharpe Ratio",
+            hovermode="x unified",
+            height=350,
+        )
+        figures["Sharpe"] = fig_sharpe
+
+    if "Beta" in df.columns:
+        fig_beta = go.Figure()
+        fig_beta.add_trace(
+            go.Scattergl(
+                x=df["date"],
+                y=df["Beta"],
+                mode="lines+markers",
+                name="Beta",
+                line=dict(color="#ff9800", width=2),
+                marker=dict(size=4),
+            )
+        )
+        # Add 1.0 reference line (market beta)
+        fig_beta.add_hline(
+            y=1.0, line_dash="dash", line_color="gray", annotation_text="Market Beta"
+        )
+        fig_beta.update_layout(
+            title="Beta vs SPY (20-day Rolling)",
+            xaxis_title="Date",
+            yaxis_title="Beta",
+            hovermode="x unified",
+            height=350,
+        )
+        figures["Beta"] = fig_beta
+
+    if "Volatility" in df.columns:
+        fig_vol = go.Figure()
+        fig_vol.add_trace(
+            go.Scattergl(
+                x=df["date"],
+                y=df["Volatility"],
+                mode="lines+markers",
+                name="Volatility",
+                line=dict(color="#9c27b0", width=2),
+                marker=dict(size=4),
+            )
+        )
+        fig_vol.update_layout(
+            title="Portfolio Volatility (Annualized)",
+            xaxis_title="Date",
+            yaxis_title="Volatility (%)",
+            hovermode="x unified",
+            height=350,
+        )
+        fig_vol.update_yaxes(tickformat=".2%")
+        figures["Volatility"] = fig_vol
+
+    return figures
+
+
+def get_historical_figures(df):
+    """
+    Return the historical figures for df, reusing them across reruns.
+
+    The query layer hands out the same DataFrame object until its cache entry
+    expires, so figures are keyed on object identity. Each entry holds a
+    reference to its DataFrame, which keeps the id from being reused.
+
+    Args:
+        df: DataFrame with historical metrics
+
+    Returns:
+        Dict mapping metric column name to its Plotly figure
+    """
+    key = id(df)
+    with _FIGURE_CACHE_LOCK:
+        entry = _FIGURE_CACHE.get(key)
+        if entry is not None:
+            _FIGURE_CACHE.move_to_end(key)
+            return entry[1]
+
+    figures = _build_historical_figures(df)
+    with _FIGURE_CACHE_LOCK:
+        _FIGURE_CACHE[key] = (df, figures)
+        while len(_FIGURE_CACHE) > FIGURE_CACHE_MAXSIZE:
+            _FIGURE_CACHE.popitem(last=False)
+    return figures
+
+
 def render_historical_charts(df):
     """
     Render interactive Plotly charts for historical metrics.
@@ -279,114 +435,34 @@ def render_historical_charts(df):
     available_cols = set(df.columns)
     logger.info(f"Available columns for charting: {available_cols}")
 
+    figures = get_historical_figures(df)
+
     # Create two columns for charts
     col1, col2 = st.columns(2)
 
     with col1:
         # VaR time series
-        if "VaR" in df.columns:
-            fig_var = go.Figure()
-            fig_var.add_trace(
-                go.Scatter(
-                    x=df["date"],
-                    y=df["VaR"],
-                    mode="lines+markers",
-                    name="VaR 95%",
-                    line=dict(color="#f44336", width=2),
-                    marker=dict(size=4),
-                )
-            )
-            fig_var.update_layout(
-                title="Value at Risk (95% Confidence)",
-                xaxis_title="Date",
-                yaxis_title="VaR (%)",
-                hovermode="x unified",
-                height=350,
-            )
-            fig_var.update_yaxes(tickformat=".2%")
-            st.plotly_chart(fig_var, use_container_width=True)
+        if "VaR" in figures:
+            st.plotly_chart(figures["VaR"], use_container_width=True)
         else:
             st.info("VaR data not available")
 
         # Sharpe ratio time series
-        if "Sharpe" in df.columns:
-            fig_sharpe = go.Figure()
-            fig_sharpe.add_trace(
-                go.Scatter(
-                    x=df["date"],
-                    y=df["Sharpe"],
-                    mode="lines+markers",
-                    name="Sharpe Ratio",
-                    line=dict(color="#2196f3", width=2),
-                    marker=dict(size=4),
-                )
-            )
-            # Add zero reference line
-            fig_sharpe.add_hline(
-                y=0, line_dash="dash", line_color="gray", annotation_text="Zero"
-            )
-            fig_sharpe.update_layout(
-                title="Sharpe Ratio (20-day Rolling)",
-                xaxis_title="Date",
-                yaxis_title="Sharpe Ratio",
-                hovermode="x unified",
-                height=350,
-            )
-            st.plotly_chart(fig_sharpe, use_container_width=True)
+        if "Sharpe" in figures:
+            st.plotly_chart(figures["Sharpe"], use_container_width=True)
         else:
             st.info("Sharpe Ratio data not available")
 
     with col2:
         # Beta time series
-        if "Beta" in df.columns:
-            fig_beta = go.Figure()
-            fig_beta.add_trace(
-                go.Scatter(
-                    x=df["date"],
-                    y=df["Beta"],
-                    mode="lines+markers",
-                    name="Beta",
-                    line=dict(color="#ff9800", width=2),
-                    marker=dict(size=4),
-                )
-            )
-            # Add 1.0 reference line (market beta)
-            fig_beta.add_hline(
-                y=1.0, line_dash="dash", line_color="gray", annotation_text="Market Beta"
-            )
-            fig_beta.update_layout(
-                title="Beta vs SPY (20-day Rolling)",
-                xaxis_title="Date",
-                yaxis_title="Beta",
-                hovermode="x unified",
-                height=350,
-            )
-            st.plotly_chart(fig_beta, use_container_width=True)
+        if "Beta" in figures:
+            st.plotly_chart(figures["Beta"], use_container_width=True)
         else:
             st.info("Beta data not available")
 
         # Volatility time series
-        if "Volatility" in df.columns:
-            fig_vol = go.Figure()
-            fig_vol.add_trace(
-                go.Scatter(
-                    x=df["date"],
-                    y=df["Volatility"],
-                    mode="lines+markers",
-                    name="Volatility",
-                    line=dict(color="#9c27b0", width=2),
-                    marker=dict(size=4),
-                )
-            )
-            fig_vol.update_layout(
-                title="Portfolio Volatility (Annualized)",
-                xaxis_title="Date",
-                yaxis_title="Volatility (%)",
-                hovermode="x unified",
-                height=350,
-            )
-            fig_vol.update_yaxes(tickformat=".2%")
-            st.plotly_chart(fig_vol, use_container_width=True)
+        if "Volatility" in figures:
+            st.plotly_chart(figures["Volatility"], use_container_width=True)
         else:
             st.info("Volatility data not available")
 
@@ -475,21 +551,26 @@ def main():
     # Clear cache if refresh clicked
     if refresh:
         st.cache_data.clear()
+        clear_dataframe_caches()
         st.rerun()
 
-    # Fetch latest metrics
+    # Fetch metrics (latest + history) and holdings concurrently; the drivers
+    # release the GIL during socket I/O so threads overlap the round trips
+    ctx = get_script_run_ctx()
     with st.spinner("Loading metrics..."):
-        metrics, data_source, latencies = fetch_latest_metrics(
-            selected_portfolio)
-        historical_df, hist_latency = fetch_historical_metrics(
-            selected_portfolio, days_back
-        )
-        holdings_data, holdings_latency = fetch_latest_portfolio_holdings(
-            selected_portfolio
-        )
+        with ThreadPoolExecutor(
+            max_workers=2,
+            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+        ) as executor:
+            metrics_future = executor.submit(
+                fetch_dashboard_metrics, selected_portfolio, days_back
+            )
+            holdings_future = executor.submit(
+                fetch_latest_portfolio_holdings, selected_portfolio
+            )
 
-    # Add historical latency to dict
-    latencies["historical"] = hist_latency
+            metrics, data_source, latencies, historical_df = metrics_future.result()
+            holdings_data, holdings_latency = holdings_future.result()
 
     # Evaluate alerts
     alerts = evaluate_all_alerts(metrics, historical_df)
@@ -7,17 +7,21 @@ with proper fallback logic and performance instrumentation.
 
 from config.redis_config import get_redis_client
 from config.mongodb_config import get_mongo_client, get_database
-import json
+import functools
 import logging
 import os
 import sys
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import orjson
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
-from pymongo import DESCENDING
+from pymongo import ASCENDING, DESCENDING
 
 # Add project root to path for config imports
 project_root = os.path.abspath(
@@ -28,18 +32,121 @@ if project_root not in sys.path:
 
 logger = logging.getLogger(__name__)
 
+# (Redis key prefix, dashboard metric key) pairs for the latest-metrics view
+METRIC_TYPES = (
+    ("VaR", "var"),
+    ("Sharpe", "sharpe"),
+    ("Beta", "beta"),
+    ("ES", "es"),
+    ("Volatility", "volatility"),
+)
+
+# (dashboard metric key, risk_metrics field) pairs for the latest-metrics view
+MONGO_METRIC_FIELDS = (
+    ("var", "VaR_95"),
+    ("sharpe", "sharpe_ratio_20d"),
+    ("beta", "beta_vs_SPY_20d"),
+    ("es", "expected_shortfall"),
+    ("volatility", "portfolio_volatility_20d"),
+)
+
+# (risk_metrics field, dashboard column) pairs for the historical charts
+HISTORY_COLUMNS = (
+    ("VaR_95", "VaR"),
+    ("expected_shortfall", "ES"),
+    ("sharpe_ratio_20d", "Sharpe"),
+    ("beta_vs_SPY_20d", "Beta"),
+    ("portfolio_volatility_20d", "Volatility"),
+)
+HISTORY_COLUMN_NAMES = dict(HISTORY_COLUMNS)
+
+# Arrow schema for risk_metrics history documents (BSON dates are millisecond precision)
+HISTORY_SCHEMA = pa.schema(
+    [("date", pa.timestamp("ms"))]
+    + [(field, pa.float64()) for field, _ in HISTORY_COLUMNS]
+)
+
+# Fields the dashboard reads from risk_metrics documents
+RISK_METRICS_PROJECTION = {
+    "date": 1,
+    "VaR_95": 1,
+    "expected_shortfall": 1,
+    "sharpe_ratio_20d": 1,
+    "beta_vs_SPY_20d": 1,
+    "portfolio_volatility_20d": 1,
+    "_id": 0
+}
+
+# Results of DataFrame-returning queries are kept for this long (seconds)
+DATAFRAME_CACHE_TTL = 60
+DATAFRAME_CACHE_MAXSIZE = 32
+
+_DATAFRAME_CACHES: List[OrderedDict] = []
+
+
+def _ttl_cache(ttl: float = DATAFRAME_CACHE_TTL, maxsize: int = DATAFRAME_CACHE_MAXSIZE):
+    """
+    LRU + TTL memoization that returns cached results by reference.
+
+    Unlike st.cache_data, hits are not pickled/unpickled, so callers must treat
+    the returned DataFrames as read-only.
+
+    Args:
+        ttl: Seconds an entry stays valid
+        maxsize: Maximum number of entries before the least recently used is evicted
+
+    Returns:
+        Decorator wrapping the query function
+    """
+    def decorator(func):
+        entries: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+        _DATAFRAME_CACHES.append(entries)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and now - entry[1] < ttl:
+                    entries.move_to_end(key)
+                    return entry[0]
+
+            result = func(*args, **kwargs)
+            with lock:
+                entries[key] = (result, time.monotonic())
+                entries.move_to_end(key)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return result
+
+        wrapper.clear = entries.clear
+        return wrapper
+
+    return decorator
+
+
+def clear_dataframe_caches() -> None:
+    """Drop every entry held by the DataFrame query caches."""
+    for entries in _DATAFRAME_CACHES:
+        entries.clear()
+
 
 @st.cache_resource
 def get_db_connections() -> Tuple[object, object]:
     """
     Initialize MongoDB and Redis connections (cached for session).
 
+    The Redis client returns raw bytes replies.
+
     Returns:
         Tuple of (MongoDB database handle, Redis client)
     """
     mongo_client = get_mongo_client()
     db = get_database(mongo_client, "portfolio_risk")
-    redis_client = get_redis_client()
+    # Metric values are parsed from raw bytes by orjson, so skip the UTF-8 decode
+    redis_client = get_redis_client(decode_responses=False)
     return db, redis_client
 
 
@@ -59,17 +166,14 @@ def fetch_latest_metrics_from_redis(
     start_time = time.time()
 
     try:
-        # Try to fetch all metric types from Redis
+        # Fetch all metric types from Redis in a single MGET round trip
         metrics = {}
-        metric_types = ["VaR", "Sharpe", "Beta", "ES", "Volatility"]
-
-        for metric_type in metric_types:
-            key = f"{metric_type}:{portfolio_id}"
-            cached_value = redis_client.get(key)
+        keys = [f"{prefix}:{portfolio_id}" for prefix, _ in METRIC_TYPES]
+        cached_values = redis_client.mget(keys)
 
+        for (_, metric_key), cached_value in zip(METRIC_TYPES, cached_values):
             if cached_value:
-                data = json.loads(cached_value)
-                metrics[metric_type.lower()] = data
+                metrics[metric_key] = orjson.loads(cached_value)
 
         latency_ms = (time.time() - start_time) * 1000
 
@@ -87,6 +191,58 @@ def fetch_latest_metrics_from_redis(
         return None, latency_ms
 
 
+def _metrics_from_document(latest_metric: Dict) -> Dict:
+    """
+    Convert a risk_metrics document to the standardized metrics format.
+
+    Args:
+        latest_metric: risk_metrics document
+
+    Returns:
+        Dict keyed by metric name with value and ts (native UTC datetime) entries
+    """
+    ts = latest_metric.get("date")
+    return {
+        key: {"value": latest_metric.get(field), "ts": ts}
+        for key, field in MONGO_METRIC_FIELDS
+    }
+
+
+def _historical_dataframe(documents: Iterable[Dict]) -> Optional[pd.DataFrame]:
+    """
+    Build the charting DataFrame from risk_metrics documents.
+
+    Documents are transposed into columns by Arrow against a fixed schema, then
+    renamed to the dashboard column names before conversion to pandas.
+
+    Args:
+        documents: risk_metrics documents (list or cursor) sorted by date
+
+    Returns:
+        DataFrame with date and dashboard metric columns (VaR, ES, Sharpe, Beta,
+        Volatility), or None if there are no documents
+    """
+    data = documents if isinstance(documents, list) else list(documents)
+    if not data:
+        return None
+
+    table = pa.Table.from_pylist(data, schema=HISTORY_SCHEMA)
+
+    # Only keep metric columns with at least one value
+    table = table.select([
+        name for name in table.column_names
+        if name == "date" or table.column(name).null_count < table.num_rows
+    ])
+    table = table.rename_columns([
+        HISTORY_COLUMN_NAMES.get(name, name) for name in table.column_names
+    ])
+    df = table.to_pandas()
+
+    # Log what columns we have
+    logger.info(f"DataFrame columns: {df.columns.tolist()}")
+    return df
+
+
 def fetch_latest_metrics_from_mongodb(
     portfolio_id: str, db: object
 ) -> Tuple[Optional[Dict], float]:
@@ -106,35 +262,14 @@ def fetch_latest_metrics_from_mongodb(
         # Query for the most recent metric document
         latest_metric = db.risk_metrics.find_one(
             {"portfolio_id": portfolio_id},
+            RISK_METRICS_PROJECTION,
             sort=[("date", DESCENDING)]
         )
 
         latency_ms = (time.time() - start_time) * 1000
 
         if latest_metric:
-            # Convert MongoDB document to standardized format
-            metrics = {
-                "var": {
-                    "value": latest_metric.get("VaR_95"),
-                    "ts": latest_metric.get("date").isoformat() + "Z" if latest_metric.get("date") else None
-                },
-                "sharpe": {
-                    "value": latest_metric.get("sharpe_ratio_20d"),
-                    "ts": latest_metric.get("date").isoformat() + "Z" if latest_metric.get("date") else None
-                },
-                "beta": {
-                    "value": latest_metric.get("beta_vs_SPY_20d"),
-                    "ts": latest_metric.get("date").isoformat() + "Z" if latest_metric.get("date") else None
-                },
-                "es": {
-                    "value": latest_metric.get("expected_shortfall"),
-                    "ts": latest_metric.get("date").isoformat() + "Z" if latest_metric.get("date") else None
-                },
-                "volatility": {
-                    "value": latest_metric.get("portfolio_volatility_20d"),
-                    "ts": latest_metric.get("date").isoformat() + "Z" if latest_metric.get("date") else None
-                }
-            }
+            metrics = _metrics_from_document(latest_metric)
 
             logger.info(
                 f"MongoDB query successful for {portfolio_id} (latency: {latency_ms:.2f}ms)")
@@ -149,40 +284,71 @@ def fetch_latest_metrics_from_mongodb(
         return None, latency_ms
 
 
-@st.cache_data(ttl=60)
-def fetch_latest_metrics(portfolio_id: str) -> Tuple[Optional[Dict], str, Dict[str, float]]:
+def fetch_metrics_with_history_from_mongodb(
+    portfolio_id: str, db: object, days: int = 60
+) -> Tuple[Optional[Dict], Optional[pd.DataFrame], float]:
     """
-    Fetch latest metrics with Redis-first fallback to MongoDB.
+    Fetch latest metrics and the historical window from MongoDB in one round trip.
+
+    A single aggregation uses $facet to return both the most recent document
+    and the documents inside the look-back window.
 
     Args:
         portfolio_id: Portfolio identifier
+        db: MongoDB database handle
+        days: Number of days to look back for the historical window
 
     Returns:
-        Tuple of (metrics dict, data source string, latency dict)
+        Tuple of (metrics dict or None, historical DataFrame or None, query latency in ms)
     """
-    db, redis_client = get_db_connections()
-    latencies = {}
+    start_time = time.time()
 
-    # Try Redis first
-    redis_metrics, redis_latency = fetch_latest_metrics_from_redis(
-        portfolio_id, redis_client)
-    latencies["redis"] = redis_latency
+    try:
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
 
-    if redis_metrics:
-        return redis_metrics, "Redis (Real-time)", latencies
+        pipeline = [
+            {"$match": {"portfolio_id": portfolio_id}},
+            {
+                "$facet": {
+                    "latest": [
+                        {"$sort": {"date": DESCENDING}},
+                        {"$limit": 1},
+                        {"$project": RISK_METRICS_PROJECTION},
+                    ],
+                    "history": [
+                        {"$match": {"date": {"$gte": start_date, "$lte": end_date}}},
+                        {"$sort": {"date": ASCENDING}},
+                        {"$project": RISK_METRICS_PROJECTION},
+                    ],
+                }
+            },
+        ]
+        result = next(
+            db.risk_metrics.aggregate(pipeline), None
+        )
 
-    # Fallback to MongoDB
-    mongo_metrics, mongo_latency = fetch_latest_metrics_from_mongodb(
-        portfolio_id, db)
-    latencies["mongodb"] = mongo_latency
+        latency_ms = (time.time() - start_time) * 1000
 
-    if mongo_metrics:
-        return mongo_metrics, "MongoDB (Historical)", latencies
+        latest = result["latest"] if result else []
+        history = result["history"] if result else []
 
-    return None, "No Data", latencies
+        metrics = _metrics_from_document(latest[0]) if latest else None
+        historical_df = _historical_dataframe(history)
 
+        logger.info(
+            f"MongoDB combined query for {portfolio_id}: latest={'found' if metrics else 'missing'}, "
+            f"history={len(history)} rows (latency: {latency_ms:.2f}ms)"
+        )
+        return metrics, historical_df, latency_ms
+
+    except Exception as e:
+        latency_ms = (time.time() - start_time) * 1000
+        logger.error(f"MongoDB combined query failed for {portfolio_id}: {e}")
+        return None, None, latency_ms
 
-@st.cache_data(ttl=60)
+
+@_ttl_cache()
 def fetch_historical_metrics(
     portfolio_id: str, days: int = 60
 ) -> Tuple[Optional[pd.DataFrame], float]:
@@ -210,41 +376,16 @@ def fetch_historical_metrics(
                 "portfolio_id": portfolio_id,
                 "date": {"$gte": start_date, "$lte": end_date}
             },
-            {
-                "date": 1,
-                "VaR_95": 1,
-                "expected_shortfall": 1,
-                "sharpe_ratio_20d": 1,
-                "beta_vs_SPY_20d": 1,
-                "portfolio_volatility_20d": 1,
-                "_id": 0
-            }
+            RISK_METRICS_PROJECTION
         ).sort("date", 1)
 
-        # Convert to DataFrame
-        data = list(cursor)
-        latency_ms = (time.time() - start_time) * 1000
+        # At most one document per day: fetch the window in a single wire batch
+        cursor = cursor.batch_size(days + 1)
 
-        if data:
-            df = pd.DataFrame(data)
-
-            # Rename columns if they exist
-            rename_map = {
-                "VaR_95": "VaR",
-                "expected_shortfall": "ES",
-                "sharpe_ratio_20d": "Sharpe",
-                "beta_vs_SPY_20d": "Beta",
-                "portfolio_volatility_20d": "Volatility"
-            }
-
-            # Only rename columns that actually exist in the DataFrame
-            existing_renames = {k: v for k,
-                                v in rename_map.items() if k in df.columns}
-            df.rename(columns=existing_renames, inplace=True)
-
-            # Log what columns we have
-            logger.info(f"DataFrame columns: {df.columns.tolist()}")
+        df = _historical_dataframe(cursor)
+        latency_ms = (time.time() - start_time) * 1000
 
+        if df is not None:
             logger.info(
                 f"Fetched {len(df)} historical metrics for {portfolio_id} "
                 f"({days} days, latency: {latency_ms:.2f}ms)"
@@ -261,6 +402,68 @@ def fetch_historical_metrics(
         return None, latency_ms
 
 
+@_ttl_cache()
+def fetch_dashboard_metrics(
+    portfolio_id: str, days: int = 60
+) -> Tuple[Optional[Dict], str, Dict[str, float], Optional[pd.DataFrame]]:
+    """
+    Fetch latest metrics (Redis-first) together with the historical window.
+
+    On a Redis hit only the historical query goes to MongoDB; on a miss a single
+    MongoDB aggregation serves both the latest metrics and the history.
+
+    Args:
+        portfolio_id: Portfolio identifier
+        days: Number of days to look back for the historical window
+
+    Returns:
+        Tuple of (metrics dict, data source string, latency dict, historical DataFrame or None)
+    """
+    db, redis_client = get_db_connections()
+    latencies = {}
+
+    # Try Redis first
+    redis_metrics, redis_latency = fetch_latest_metrics_from_redis(
+        portfolio_id, redis_client)
+    latencies["redis"] = redis_latency
+
+    if redis_metrics:
+        historical_df, hist_latency = fetch_historical_metrics(portfolio_id, days)
+        latencies["historical"] = hist_latency
+        return redis_metrics, "Redis (Real-time)", latencies, historical_df
+
+    # Fallback to MongoDB for latest and historical metrics in one round trip
+    mongo_metrics, historical_df, mongo_latency = fetch_metrics_with_history_from_mongodb(
+        portfolio_id, db, days)
+    latencies["mongodb"] = mongo_latency
+    latencies["historical"] = mongo_latency
+
+    if mongo_metrics:
+        return mongo_metrics, "MongoDB (Historical)", latencies, historical_df
+
+    return None, "No Data", latencies, historical_df
+
+
+def fetch_latest_metrics(
+    portfolio_id: str, days: int = 60
+) -> Tuple[Optional[Dict], str, Dict[str, float]]:
+    """
+    Fetch latest metrics with Redis-first fallback to MongoDB.
+
+    Thin wrapper over fetch_dashboard_metrics, so it shares that function's cache and
+    query path instead of issuing separate reads.
+
+    Args:
+        portfolio_id: Portfolio identifier
+        days: Historical window of the shared dashboard query (default 60)
+
+    Returns:
+        Tuple of (metrics dict, data source string, latency dict)
+    """
+    metrics, source, latencies, _ = fetch_dashboard_metrics(portfolio_id, days)
+    return metrics, source, latencies
+
+
 @st.cache_data(ttl=300)
 def fetch_latest_portfolio_holdings(portfolio_id: str) -> Tuple[Optional[Dict], float]:
     """
@@ -276,27 +479,55 @@ def fetch_latest_portfolio_holdings(portfolio_id: str) -> Tuple[Optional[Dict],
     db, _ = get_db_connections()
 
     try:
-        # Query for most recent holdings snapshot
-        latest_holdings = db.portfolio_holdings.find_one(
-            {"portfolio_id": portfolio_id},
-            sort=[("date", DESCENDING)]
+        # Aggregate sector weights server-side for the most recent snapshot so
+        # only one row per sector crosses the wire instead of every asset
+        pipeline = [
+            {"$match": {"portfolio_id": portfolio_id}},
+            {"$sort": {"date": DESCENDING}},
+            {"$limit": 1},
+            {
+                "$facet": {
+                    "meta": [
+                        {
+                            "$project": {
+                                "_id": 0,
+                                "date": 1,
+                                "gross_exposure": 1,
+                                "has_assets": {"$isArray": "$assets"},
+                                "num_assets": {"$size": {"$ifNull": ["$assets", []]}},
+                            }
+                        }
+                    ],
+                    "sectors": [
+                        {"$unwind": "$assets"},
+                        {
+                            "$group": {
+                                "_id": {"$ifNull": ["$assets.sector", "Unknown"]},
+                                "weight": {"$sum": {"$ifNull": ["$assets.weight", 0]}},
+                            }
+                        },
+                    ],
+                }
+            },
+        ]
+        result = next(
+            db.portfolio_holdings.aggregate(pipeline), None
         )
 
         latency_ms = (time.time() - start_time) * 1000
 
-        if latest_holdings and "assets" in latest_holdings:
-            # Aggregate by sector
-            sector_weights = {}
-            for asset in latest_holdings["assets"]:
-                sector = asset.get("sector", "Unknown")
-                weight = asset.get("weight", 0)
-                sector_weights[sector] = sector_weights.get(sector, 0) + weight
+        latest_holdings = result["meta"][0] if result and result["meta"] else None
+
+        if latest_holdings and latest_holdings.get("has_assets"):
+            sector_weights = {
+                group["_id"]: group["weight"] for group in result["sectors"]
+            }
 
             holdings_data = {
                 "date": latest_holdings.get("date"),
                 "sector_weights": sector_weights,
                 "gross_exposure": latest_holdings.get("gross_exposure"),
-                "num_assets": len(latest_holdings["assets"])
+                "num_assets": latest_holdings["num_assets"]
             }
 
             logger.info(
@@ -312,19 +543,29 @@ def fetch_latest_portfolio_holdings(portfolio_id: str) -> Tuple[Optional[Dict],
         return None, latency_ms
 
 
-@st.cache_data(ttl=60)
+@st.cache_data(ttl=3600)
 def get_available_portfolios() -> List[str]:
     """
     Get list of portfolios with data in MongoDB.
 
+    The portfolio universe changes rarely, so the list is cached for an hour;
+    the sidebar refresh button clears it early.
+
     Returns:
         List of portfolio IDs
     """
     db, _ = get_db_connections()
 
     try:
-        # Get distinct portfolio IDs from risk_metrics collection
-        portfolios = db.risk_metrics.distinct("portfolio_id")
+        # Group on the leading key of the (portfolio_id, date) index so the planner
+        # can answer with an index-only DISTINCT_SCAN
+        cursor = db.risk_metrics.aggregate(
+            [
+                {"$sort": {"portfolio_id": 1}},
+                {"$group": {"_id": "$portfolio_id"}},
+            ]
+        )
+        portfolios = [doc["_id"] for doc in cursor]
         logger.info(f"Found {len(portfolios)} portfolios in database")
         return sorted(portfolios)
     except Exception as e:
@@ -1,24 +1,24 @@
 """Quick script to check Redis cache contents."""
-import os
-import redis
-import json
+from config.redis_config import get_redis_client
 
-r = redis.Redis(
-    host=os.getenv('REDIS_HOST'),
-    port=int(os.getenv('REDIS_PORT')),
-    password=os.getenv('REDIS_PASSWORD'),
-    decode_responses=True
-)
+# Shared keepalive/health-checked pool instead of an ad-hoc connection
+r = get_redis_client()
 
-print("All Redis keys:", r.keys('*'))
-print("\nVaR metrics:")
-for key in r.keys('VaR:*'):
-    print(f"  {key}: {r.get(key)}")
+# SCAN iterates incrementally instead of blocking the server like KEYS
+print("All Redis keys:", list(r.scan_iter(match='*', count=500)))
 
-print("\nSharpe metrics:")
-for key in r.keys('Sharpe:*'):
-    print(f"  {key}: {r.get(key)}")
+prefixes = (("VaR", 'VaR:*'), ("Sharpe", 'Sharpe:*'), ("Beta", 'Beta:*'))
+keys_by_prefix = [list(r.scan_iter(match=pattern, count=500)) for _, pattern in prefixes]
 
-print("\nBeta metrics:")
-for key in r.keys('Beta:*'):
-    print(f"  {key}: {r.get(key)}")
+# Ship every MGET in one pipeline round trip
+pipe = r.pipeline(transaction=False)
+for keys in keys_by_prefix:
+    if keys:
+        pipe.mget(keys)
+results = iter(pipe.execute())
+
+for (label, _), keys in zip(prefixes, keys_by_prefix):
+    print(f"\n{label} metrics:")
+    values = next(results) if keys else []
+    for key, value in zip(keys, values):
+        print(f"  {key}: {value}")
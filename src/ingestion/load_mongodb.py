@@ -3,16 +3,20 @@
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Literal
 
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import yaml
 from pymongo import ASCENDING, DESCENDING, MongoClient
 from pymongo.operations import UpdateOne
+from pymongo.write_concern import WriteConcern
 from pymongo.errors import BulkWriteError
 
 from config.mongodb_config import get_database, get_mongo_client
@@ -45,6 +49,34 @@ SECTOR_MAP: Dict[str, str] = {
 
 BENCHMARK_TICKERS: tuple[str, ...] = ("SPY", "QQQ", "IWM")
 
+# Sector lookups derived once from SECTOR_MAP
+SECTOR_NAMES: tuple[str, ...] = tuple(dict.fromkeys(SECTOR_MAP.values()))
+TICKERS_BY_SECTOR: Dict[str, list[str]] = {
+    sector: [ticker for ticker, ticker_sector in SECTOR_MAP.items() if ticker_sector == sector]
+    for sector in SECTOR_NAMES
+}
+_TICKER_ROWS: Dict[str, int] = {ticker: row for row, ticker in enumerate(SECTOR_MAP)}
+
+# (tickers x sectors) membership matrix, rows in SECTOR_MAP order
+SECTOR_ONEHOT = np.zeros((len(SECTOR_MAP), len(SECTOR_NAMES)))
+SECTOR_ONEHOT[np.arange(len(SECTOR_MAP)),
+              [SECTOR_NAMES.index(sector) for sector in SECTOR_MAP.values()]] = 1.0
+SECTOR_ONEHOT.flags.writeable = False
+
+PRICE_FIELDS: tuple[str, ...] = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+
+# Trailing window (trading days) for the per-asset daily volatility in snapshots
+VOL_WINDOW = 20
+
+# Documents per insert_many call on the initial-load path
+INSERT_BATCH_SIZE = 1000
+
+# UpdateOne requests per bulk_write call on the upsert path
+BULK_WRITE_BATCH_SIZE = 1000
+
+# Concurrent upload threads sharing the pooled MongoClient
+UPLOAD_WORKERS = 8
+
 
 @dataclass
 class PortfolioConfig:
@@ -68,6 +100,25 @@ def load_prices(parquet_path: Path) -> pd.DataFrame:
     return data.sort_index()
 
 
+def load_close_prices(parquet_path: Path) -> pd.DataFrame:
+    """Load only the Close columns of the OHLCV parquet.
+
+    Arrow skips the column chunks of every other field, so snapshot building
+    reads about a sixth of the file.
+    """
+
+    column_names = pq.read_schema(parquet_path).names
+    close_columns = [name for name in column_names if name.endswith(", 'Close')")]
+    data = pq.read_table(
+        parquet_path, columns=close_columns, use_pandas_metadata=True).to_pandas()
+    if not isinstance(data.columns, pd.MultiIndex):
+        raise ValueError(
+            "Expected a MultiIndex column structure for ticker and field")
+    data.columns.names = ["Ticker", "Field"]
+    data.index = pd.to_datetime(data.index, utc=True)
+    return data.sort_index()
+
+
 def generate_portfolio_configs(portfolio_yaml: Path) -> list[PortfolioConfig]:
     """Parse the portfolio configuration YAML file."""
 
@@ -88,14 +139,24 @@ def generate_portfolio_configs(portfolio_yaml: Path) -> list[PortfolioConfig]:
     return configs
 
 
-def _sample_sector_weights(config: PortfolioConfig, rng: np.random.Generator) -> Dict[str, float]:
-    """Sample sector weights within configured bounds."""
+def _sample_sector_weights(
+    config: PortfolioConfig, rng: np.random.Generator, n_samples: int
+) -> list[Dict[str, float]]:
+    """Sample n_samples sets of sector weights within configured bounds.
+
+    All draws come from a single vectorised rng.uniform call; rows are consumed
+    in the same order as successive per-sector scalar draws.
+    """
+
+    sectors = list(config.sector_limits)
+    low = [float(bounds["min"]) for bounds in config.sector_limits.values()]
+    high = [float(bounds["max"]) for bounds in config.sector_limits.values()]
+    draws = rng.uniform(low, high, size=(n_samples, len(sectors))).tolist()
+    return [_normalise_sector_weights(dict(zip(sectors, row))) for row in draws]
 
-    sector_weights: Dict[str, float] = {}
-    for sector, bounds in config.sector_limits.items():
-        min_w = float(bounds["min"])
-        max_w = float(bounds["max"])
-        sector_weights[sector] = rng.uniform(min_w, max_w)
+
+def _normalise_sector_weights(sector_weights: Dict[str, float]) -> Dict[str, float]:
+    """Assign any residual to Benchmark and rescale weights to sum to one."""
 
     total = sum(sector_weights.values())
     residual = max(0.0, 1.0 - total)
@@ -139,15 +200,6 @@ def _distribute_within_sector(
     return ticker_weights
 
 
-def _build_ticker_sector_mapping() -> Dict[str, list[str]]:
-    """Map sectors to the tickers available for allocation."""
-
-    sector_map: Dict[str, list[str]] = {}
-    for ticker, sector in SECTOR_MAP.items():
-        sector_map.setdefault(sector, []).append(ticker)
-    return sector_map
-
-
 def _rebalance_frequency_days(freq: str) -> int:
     """Translate rebalance frequency keywords to day counts."""
 
@@ -158,127 +210,275 @@ def _rebalance_frequency_days(freq: str) -> int:
     raise ValueError(f"Unsupported rebalance frequency: {freq}")
 
 
+def _simple_returns(close_values: np.ndarray) -> np.ndarray:
+    """Daily simple returns with a zero first row; NaN/inf from gaps become zero."""
+
+    returns = np.zeros_like(close_values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(close_values[1:], close_values[:-1], out=returns[1:])
+    returns[1:] -= 1.0
+    np.nan_to_num(returns, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return returns
+
+
+def _rolling_volatility(returns: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sample standard deviation of each column over a trailing window.
+
+    Leading rows without a full window take the first full-window value, and a
+    history shorter than the window yields zeros.
+    """
+
+    n_dates, n_tickers = returns.shape
+    if n_dates < window:
+        return np.zeros((n_dates, n_tickers))
+
+    windows = np.lib.stride_tricks.sliding_window_view(returns, window, axis=0)
+    vol = np.empty((n_dates, n_tickers))
+    windows.std(axis=-1, ddof=1, out=vol[window - 1:])
+    np.nan_to_num(vol, copy=False, nan=0.0)
+    vol[:window - 1] = vol[window - 1]
+    return vol
+
+
 def build_portfolio_snapshots(
     prices: pd.DataFrame,
     configs: list[PortfolioConfig],
 ) -> list[Dict[str, object]]:
-    """Generate synthetic portfolio snapshots based on price history."""
+    """Generate synthetic portfolio snapshots based on price history.
+
+    Weights are constant between rebalances, so normalisation and sector
+    exposure are computed once per rebalance period with array operations;
+    prices and volatilities are gathered for the whole period by column index.
+    """
 
     close_prices = prices.xs("Close", axis=1, level="Field")
-    returns = close_prices.pct_change().fillna(0.0)
-    rolling_vol = (
-        returns.rolling(window=20)
-        .std()
-        .bfill()
-        .fillna(0.0)
-    )
+    close_values = close_prices.to_numpy(dtype="float64")
+    vol_values = _rolling_volatility(_simple_returns(close_values), VOL_WINDOW)
+    column_index = {ticker: idx for idx, ticker in enumerate(close_prices.columns)}
+
+    index = close_prices.index
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    dates = index.to_pydatetime()
+    n_dates = len(dates)
 
-    tickers_by_sector = _build_ticker_sector_mapping()
     rng = np.random.default_rng(seed=42)
 
     snapshots: list[Dict[str, object]] = []
     for config in configs:
         rebalance_days = _rebalance_frequency_days(config.rebalance_frequency)
-        current_weights: Dict[str, float] = {}
-        days_until_rebalance = 0
-
-        for as_of in close_prices.index:
-            if days_until_rebalance <= 0 or not current_weights:
-                sector_weights = _sample_sector_weights(config, rng)
-                ticker_weights = _distribute_within_sector(
-                    sector_weights, tickers_by_sector, config.position_size)
-                current_weights = ticker_weights
-                days_until_rebalance = rebalance_days
-            days_until_rebalance -= 1
-
-            asset_entries: list[Dict[str, object]] = []
-            sector_exposure: Dict[str, float] = {}
-            gross_exposure = 0.0
-
-            for ticker, weight in current_weights.items():
-                if ticker not in close_prices.columns:
-                    continue
-                price = float(close_prices.loc[as_of, ticker])
-                vol = float(rolling_vol.loc[as_of, ticker])
-                sector = SECTOR_MAP.get(ticker, "Other")
-                asset_entries.append(
+
+        # One batch of draws covers every rebalance in the history
+        samples = iter(())
+
+        start = 0
+        while start < n_dates:
+            sector_weights = next(samples, None)
+            if sector_weights is None:
+                n_rebalances = -(-(n_dates - start) // rebalance_days)
+                samples = iter(_sample_sector_weights(config, rng, n_rebalances))
+                sector_weights = next(samples)
+            ticker_weights = _distribute_within_sector(
+                sector_weights, TICKERS_BY_SECTOR, config.position_size)
+            # An empty allocation is resampled on the next date
+            stop = min(start + (rebalance_days if ticker_weights else 1), n_dates)
+
+            tickers = [ticker for ticker in ticker_weights if ticker in column_index]
+            weights = np.array([ticker_weights[ticker] for ticker in tickers], dtype="float64")
+            scaling = weights.sum()
+            if scaling == 0:
+                start = stop
+                continue
+            # Rescaled weights sum to one by construction; no need to re-sum them
+            weights = weights / scaling
+            gross_exposure = 1.0
+
+            # Sector exposure in one matmul against the module-level one-hot rows
+            asset_sectors = [SECTOR_MAP.get(ticker, "Other") for ticker in tickers]
+            membership = SECTOR_ONEHOT[[_TICKER_ROWS[ticker] for ticker in tickers]]
+            exposure = (weights @ membership).tolist()
+            sector_exposure = {
+                SECTOR_NAMES[idx]: exposure[idx]
+                for idx in np.flatnonzero(membership.any(axis=0))
+            }
+
+            columns = [column_index[ticker] for ticker in tickers]
+            weight_list = weights.tolist()
+            price_rows = close_values[start:stop, columns].tolist()
+            vol_rows = vol_values[start:stop, columns].tolist()
+
+            for as_of_dt, price_row, vol_row in zip(dates[start:stop], price_rows, vol_rows):
+                asset_entries = [
                     {
                         "ticker": ticker,
-                        "weight": float(weight),
+                        "weight": weight,
                         "sector": sector,
                         "price": price,
                         "daily_vol": vol,
                     }
+                    for ticker, weight, sector, price, vol in zip(
+                        tickers, weight_list, asset_sectors, price_row, vol_row)
+                ]
+                snapshots.append(
+                    {
+                        "portfolio_id": config.portfolio_id,
+                        "date": as_of_dt,
+                        "assets": asset_entries,
+                        "gross_exposure": gross_exposure,
+                        "net_exposure_by_sector": dict(sector_exposure),
+                    }
                 )
-                sector_exposure[sector] = sector_exposure.get(
-                    sector, 0.0) + float(weight)
-                gross_exposure += float(weight)
 
-            scaling = sum(item["weight"] for item in asset_entries)
-            if scaling == 0:
-                continue
-            for item in asset_entries:
-                item["weight"] = item["weight"] / scaling
-            gross_exposure = sum(item["weight"] for item in asset_entries)
-            sector_exposure = {
-                sector: exp / gross_exposure for sector, exp in sector_exposure.items()}
-
-            snapshot = {
-                "portfolio_id": config.portfolio_id,
-                "date": datetime.fromtimestamp(as_of.timestamp(), tz=timezone.utc),
-                "assets": asset_entries,
-                "gross_exposure": gross_exposure,
-                "net_exposure_by_sector": sector_exposure,
-            }
-            snapshots.append(snapshot)
+            start = stop
 
     return snapshots
 
 
 def build_price_documents(prices: pd.DataFrame) -> List[Dict[str, object]]:
-    """Convert the OHLCV DataFrame into MongoDB documents."""
-
-    documents: list[Dict[str, object]] = []
-    fields = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
-
-    for as_of, row in prices.iterrows():
-        as_of_dt = datetime.fromtimestamp(
-            pd.Timestamp(as_of).timestamp(), tz=timezone.utc)
-        for ticker in TICKERS:
-            ticker_slice = row.get(ticker)
-            if ticker_slice is None:
-                continue
-            document = {
-                "ticker": ticker,
-                "date": as_of_dt,
-                "source": "yfinance",
-            }
-            for field in fields:
-                if field in ticker_slice:
-                    document[field.lower().replace(" ", "_")] = float(
-                        ticker_slice[field])
-            documents.append(document)
-
-    return documents
-
+    """Convert the OHLCV DataFrame into MongoDB documents.
+
+    The (date x ticker/field) panel is reshaped to one row per (date, ticker)
+    with a single stack, so field extraction and float conversion run in pandas
+    rather than per row.
+    """
+
+    in_universe = prices.columns.get_level_values("Ticker").isin(TICKERS)
+    stacked = prices.loc[:, in_universe].stack(level="Ticker", future_stack=True)
+
+    fields = [field for field in PRICE_FIELDS if field in stacked.columns]
+    stacked = stacked[fields].astype("float64")
+    stacked.columns = [field.lower().replace(" ", "_") for field in fields]
+
+    dates = stacked.index.get_level_values(0).tz_convert("UTC").to_pydatetime()
+    tickers = stacked.index.get_level_values("Ticker")
+    records = stacked.to_dict(orient="records")
+
+    return [
+        {"ticker": ticker, "date": as_of_dt, "source": "yfinance", **record}
+        for ticker, as_of_dt, record in zip(tickers, dates, records)
+    ]
+
+
+def upsert_documents(
+    collection,
+    documents: Iterable[Dict[str, object]],
+    key_fields: tuple[str, ...],
+    mode: Literal["insert", "upsert"] = "upsert",
+) -> None:
+    """Write the provided documents to a collection.
+
+    Args:
+        collection: Target MongoDB collection.
+        documents: Documents to write.
+        key_fields: Fields identifying a document for upserts.
+        mode: "upsert" issues one UpdateOne per document for incremental loads;
+            "insert" uses batched insert_many and assumes no matching documents exist.
+    """
+
+    if mode == "insert":
+        _insert_documents(collection, documents)
+        return
 
-def upsert_documents(collection, documents: Iterable[Dict[str, object]], key_fields: tuple[str, ...]) -> None:
-    """Perform bulk upserts for the provided documents."""
+    # Build UpdateOne requests lazily and send them in fixed-size batches
+    requests = (
+        UpdateOne({field: doc[field] for field in key_fields}, {"$set": doc}, upsert=True)
+        for doc in documents
+    )
+    written = 0
+    while True:
+        batch = list(islice(requests, BULK_WRITE_BATCH_SIZE))
+        if not batch:
+            break
+        try:
+            collection.bulk_write(batch, ordered=False)
+        except BulkWriteError as exc:
+            logger.error("Bulk write failure", extra={"details": exc.details})
+            raise
+        written += len(batch)
+
+    if not written:
+        logger.warning("No documents to upsert")
 
-    requests: list[UpdateOne] = []
-    for doc in documents:
-        filter_query = {field: doc[field] for field in key_fields}
-        requests.append(UpdateOne(filter_query, {"$set": doc}, upsert=True))
 
-    if not requests:
-        logger.warning("No documents to upsert")
+def _insert_documents(collection, documents: Iterable[Dict[str, object]]) -> None:
+    """Insert documents in fixed-size unordered insert_many batches.
+
+    Documents are built by this module, so server-side schema validation is skipped.
+    """
+
+    iterator = iter(documents)
+    inserted = 0
+    while True:
+        batch = list(islice(iterator, INSERT_BATCH_SIZE))
+        if not batch:
+            break
+        try:
+            collection.insert_many(
+                batch, ordered=False, bypass_document_validation=True)
+        except BulkWriteError as exc:
+            logger.error("Bulk insert failure", extra={"details": exc.details})
+            raise
+        inserted += len(batch)
+
+    if not inserted:
+        logger.warning("No documents to insert")
+
+
+def _upload_chunk(
+    collection_name: str,
+    chunk: list[Dict[str, object]],
+    key_fields: tuple[str, ...],
+    mode: Literal["insert", "upsert"],
+) -> int:
+    """Write one chunk of documents through the shared MongoDB client."""
+
+    collection = get_database(get_mongo_client())[collection_name].with_options(
+        write_concern=WriteConcern(w=1))
+    upsert_documents(collection, chunk, key_fields, mode=mode)
+    return len(chunk)
+
+
+def upload_documents(
+    collection_name: str,
+    documents: list[Dict[str, object]],
+    key_fields: tuple[str, ...],
+    mode: Literal["insert", "upsert"] = "upsert",
+    max_workers: int = UPLOAD_WORKERS,
+) -> None:
+    """Write documents concurrently from a thread pool sharing one MongoClient.
+
+    The documents are split into roughly 2 x CPU-count chunks; PyMongo clients
+    are thread-safe and hand each worker its own pooled connection.
+
+    Args:
+        collection_name: Target collection in the project database.
+        documents: Documents to write.
+        key_fields: Fields identifying a document for upserts.
+        mode: Write mode passed through to upsert_documents.
+        max_workers: Number of upload threads.
+    """
+
+    if not documents:
+        logger.warning("No documents to upload", extra={"collection": collection_name})
         return
 
-    try:
-        collection.bulk_write(requests, ordered=False)
-    except BulkWriteError as exc:
-        logger.error("Bulk write failure", extra={"details": exc.details})
-        raise
+    n_chunks = min(len(documents), (os.cpu_count() or 1) * 2)
+    chunk_size = -(-len(documents) // n_chunks)
+    chunks = [documents[i:i + chunk_size]
+              for i in range(0, len(documents), chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_upload_chunk, collection_name, chunk, key_fields, mode)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                # Surface the first failure without starting the remaining chunks
+                for pending in futures:
+                    pending.cancel()
+                raise
 
 
 def ensure_indexes(db) -> None:
@@ -291,13 +491,19 @@ def ensure_indexes(db) -> None:
     )
 
 
-def ingest(parquet_path: Path, portfolio_config_path: Path) -> None:
-    """Ingest price history and portfolio holdings into MongoDB."""
+def ingest(parquet_path: Path, portfolio_config_path: Path, full_reload: bool = False) -> None:
+    """Ingest price history and portfolio holdings into MongoDB.
 
-    prices = load_prices(parquet_path)
-    price_docs = build_price_documents(prices)
+    Args:
+        parquet_path: Raw OHLCV parquet file.
+        portfolio_config_path: Portfolio configuration YAML file.
+        full_reload: Drop the prices and holdings collections before loading.
+    """
+
+    price_docs = build_price_documents(load_prices(parquet_path))
     configs = generate_portfolio_configs(portfolio_config_path)
-    holdings_docs = build_portfolio_snapshots(prices, configs)
+    # Snapshots only use Close, so read a column-pruned copy instead of the full panel
+    holdings_docs = build_portfolio_snapshots(load_close_prices(parquet_path), configs)
 
     logger.info(
         "Prepared documents",
@@ -310,11 +516,27 @@ def ingest(parquet_path: Path, portfolio_config_path: Path) -> None:
     client: MongoClient = get_mongo_client()
     db = get_database(client)
 
-    ensure_indexes(db)
-    upsert_documents(db.prices, price_docs, key_fields=("ticker", "date"))
-    upsert_documents(db.portfolio_holdings, holdings_docs,
-                     key_fields=("portfolio_id", "date"))
-    logger.info("Ingestion complete")
+    if full_reload:
+        db.prices.drop()
+        db.portfolio_holdings.drop()
+
+    # Empty collections take the insert_many fast path; otherwise upsert incrementally
+    initial_load = (
+        db.prices.estimated_document_count() == 0
+        and db.portfolio_holdings.estimated_document_count() == 0
+    )
+    mode = "insert" if initial_load else "upsert"
+
+    if not initial_load:
+        ensure_indexes(db)
+    upload_documents("prices", price_docs,
+                     key_fields=("ticker", "date"), mode=mode)
+    upload_documents("portfolio_holdings", holdings_docs,
+                     key_fields=("portfolio_id", "date"), mode=mode)
+    if initial_load:
+        # Build indexes once over the loaded data instead of maintaining them per insert
+        ensure_indexes(db)
+    logger.info("Ingestion complete", extra={"mode": mode})
 
 
 def main() -> None:
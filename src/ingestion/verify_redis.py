@@ -61,9 +61,12 @@ def verify_redis_connection() -> bool:
             "current_VaR_95": -0.0231,
             "ts": datetime.utcnow().isoformat() + "Z"
         }
-        r.setex(metric_key, 60, json.dumps(metric_data))
+        # Write and read back in one pipelined round trip
+        pipe = r.pipeline(transaction=False)
+        pipe.setex(metric_key, 60, json.dumps(metric_data))
+        pipe.get(metric_key)
+        _, cached = pipe.execute()
 
-        cached = r.get(metric_key)
         if not cached:
             logger.error("JSON cache write/read failed")
             return False
@@ -77,11 +80,12 @@ def verify_redis_connection() -> bool:
 
         # Test 5: Hash operations (simulating alert flags)
         alert_key = "Alert:TEST_PORT"
-        r.hset(alert_key, "var_spike", "true")
-        r.hset(alert_key, "beta_limit_breach", "false")
-        r.expire(alert_key, 120)
-
-        alert_data = r.hgetall(alert_key)
+        pipe = r.pipeline(transaction=False)
+        pipe.hset(alert_key, mapping={
+                  "var_spike": "true", "beta_limit_breach": "false"})
+        pipe.expire(alert_key, 120)
+        pipe.hgetall(alert_key)
+        *_, alert_data = pipe.execute()
         if alert_data.get("var_spike") != "true":
             logger.error("Hash operation failed")
             return False
@@ -2,29 +2,136 @@
 
 from __future__ import annotations
 
-import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import orjson
+from redis import Redis
+from redis.client import Pipeline
 
 from config.redis_config import get_redis_client
 
 logger = logging.getLogger(__name__)
 
+# orjson emits bytes, which redis-py writes without a separate encode step;
+# NumPy scalars from the risk engine serialize natively
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+# Set one hash field and refresh the key's TTL atomically in a single round trip
+_HSET_EXPIRE_SCRIPT = """
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# Redis clients shared by every CacheManager in the process, keyed by decode_responses
+_shared_clients: Dict[bool, Redis] = {}
+_shared_client_lock = threading.Lock()
+
+SERIALIZERS = ("json", "msgpack")
+
+
+def _get_shared_client(decode_responses: bool = True) -> Redis:
+    """Return the process-wide Redis client, creating it on first use."""
+    client = _shared_clients.get(decode_responses)
+    if client is None:
+        with _shared_client_lock:
+            client = _shared_clients.get(decode_responses)
+            if client is None:
+                client = get_redis_client(decode_responses=decode_responses)
+                _shared_clients[decode_responses] = client
+    return client
+
+
+def _orjson_dumps(data: Dict[str, Any]) -> bytes:
+    """Encode a cache payload as JSON bytes."""
+    return orjson.dumps(data, option=_ORJSON_OPTIONS)
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Convert NumPy scalars, which msgpack cannot pack, to Python numbers."""
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
 
 class CacheManager:
     """Manages Redis cache for portfolio risk metrics."""
 
-    def __init__(self, default_ttl: int = 60):
+    def __init__(self, default_ttl: int = 60, use_hash: bool = False, serializer: str = "json"):
         """
         Initialize cache manager.
 
         Args:
             default_ttl: Default time-to-live in seconds (default 60)
+            use_hash: Store metrics as fields of one Redis hash per portfolio
+                (portfolio:<portfolio_id>) instead of one JSON key per metric
+            serializer: Payload encoding for metric keys, "json" (default, readable by
+                the dashboard) or "msgpack" (smaller and faster, Python-only consumers;
+                requires the msgpack package)
+
+        Raises:
+            ValueError: If serializer is not supported, or is "msgpack" and the msgpack
+                package is not installed
         """
-        self.redis_client = get_redis_client()
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"serializer must be one of {SERIALIZERS}, got {serializer!r}")
+
+        if serializer == "msgpack":
+            try:
+                import msgpack
+            except ImportError as e:
+                raise ValueError(
+                    'serializer="msgpack" requires the msgpack package (pip install msgpack)'
+                ) from e
+
+            self._dumps = lambda data: msgpack.packb(
+                data, use_bin_type=True, datetime=True, default=_msgpack_default)
+            self._loads = lambda payload: msgpack.unpackb(payload, raw=False, timestamp=3)
+        else:
+            self._dumps = _orjson_dumps
+            self._loads = orjson.loads
+
+        # Binary payloads need raw bytes replies
+        self.redis_client = _get_shared_client(decode_responses=serializer == "json")
         self.default_ttl = default_ttl
-        logger.info(f"CacheManager initialized with TTL={default_ttl}s")
+        self.use_hash = use_hash
+        self.serializer = serializer
+        # EVALSHA reuses the server-cached script after the first call
+        self._hset_expire = self.redis_client.register_script(_HSET_EXPIRE_SCRIPT)
+        logger.info(
+            f"CacheManager initialized with TTL={default_ttl}s "
+            f"({'hash' if use_hash else serializer} storage)"
+        )
+
+    @contextmanager
+    def pipeline(self) -> Iterator[Pipeline]:
+        """
+        Batch cache writes for several portfolios into one round trip.
+
+        Pass the yielded pipeline to set_all_metrics, set_metrics_batch or
+        set_metrics_hash; queued commands are sent together when the block exits
+        without an exception.
+
+        Yields:
+            Non-transactional Redis pipeline
+
+        Example:
+            >>> cm = CacheManager()
+            >>> with cm.pipeline() as pipe:
+            ...     cm.set_metrics_batch("PORT_A_TechGrowth", {"VaR_95": -0.0231}, pipeline=pipe)
+            ...     cm.set_metrics_batch("PORT_B_Balanced", {"VaR_95": -0.0154}, pipeline=pipe)
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        try:
+            yield pipe
+            pipe.execute()
+        finally:
+            pipe.reset()
 
     def _build_key(self, metric_type: str, portfolio_id: str) -> str:
         """
@@ -47,6 +154,20 @@ class CacheManager:
         """
         return f"{metric_type}:{portfolio_id}"
 
+    def _hash_key(self, portfolio_id: str) -> str:
+        """
+        Build the Redis key of a portfolio's metrics hash.
+
+        Format: portfolio:<portfolio_id>
+
+        Args:
+            portfolio_id: Portfolio identifier
+
+        Returns:
+            Formatted Redis key string
+        """
+        return self._build_key("portfolio", portfolio_id)
+
     def set_metric(
         self,
         portfolio_id: str,
@@ -63,7 +184,7 @@ class CacheManager:
             metric_type: Type of metric (VaR, Sharpe, Beta)
             value: Metric value to cache
             ttl: Time-to-live in seconds (uses default if None)
-            metadata: Optional additional data to store
+            metadata: Optional additional data to store (JSON storage only)
 
         Returns:
             True if successfully cached, False otherwise
@@ -72,21 +193,26 @@ class CacheManager:
             >>> cm = CacheManager()
             >>> cm.set_metric("PORT_A_TechGrowth", "VaR", -0.0231, metadata={"confidence": 0.95})
         """
+        if self.use_hash:
+            # Hash fields hold flat values only; metadata is kept in JSON storage
+            return self.set_metrics_hash(portfolio_id, {metric_type: value}, ttl=ttl)
+
         key = self._build_key(metric_type, portfolio_id)
         ttl_seconds = ttl if ttl is not None else self.default_ttl
 
         data = {
             f"current_{metric_type}": value,
             "ts": datetime.now(timezone.utc).isoformat(),
+            "ts_unix": time.time(),
         }
 
         if metadata:
             data.update(metadata)
 
         try:
-            self.redis_client.setex(name=key, time=ttl_seconds, value=json.dumps(data))
+            self.redis_client.setex(name=key, time=ttl_seconds, value=self._dumps(data))
             logger.info(
-                f"Cached {metric_type} for {portfolio_id}: {value:.6f} (TTL={ttl_seconds}s)"
+                "Cached %s for %s: %.6f (TTL=%ss)", metric_type, portfolio_id, value, ttl_seconds
             )
             return True
 
@@ -114,28 +240,46 @@ class CacheManager:
             >>> if data:
             ...     print(f"VaR: {data['current_VaR']}, cached at {data['ts']}")
         """
-        key = self._build_key(metric_type, portfolio_id)
+        key = self._hash_key(portfolio_id) if self.use_hash else self._build_key(
+            metric_type, portfolio_id)
 
         try:
-            cached = self.redis_client.get(key)
+            if self.use_hash:
+                # Partial read of the metric and its timestamp
+                value, ts, ts_unix = self.redis_client.hmget(
+                    key, [metric_type, "ts", "ts_unix"])
+                if value is None:
+                    logger.debug("Cache miss for %s (%s)", key, metric_type)
+                    return None
+                if isinstance(ts, bytes):
+                    ts = ts.decode("utf-8")
+                data = {f"current_{metric_type}": float(value), "ts": ts}
+                if ts_unix is not None:
+                    data["ts_unix"] = float(ts_unix)
+            else:
+                cached = self.redis_client.get(key)
 
-            if cached is None:
-                logger.debug(f"Cache miss for {key}")
-                return None
+                if cached is None:
+                    logger.debug("Cache miss for %s", key)
+                    return None
 
-            data = json.loads(cached)
+                data = self._loads(cached)
 
-            if max_age_seconds is not None and "ts" in data:
-                cached_time = datetime.fromisoformat(data["ts"].replace("Z", "+00:00"))
-                age_seconds = (datetime.now(timezone.utc) - cached_time).total_seconds()
+            if max_age_seconds is not None and ("ts_unix" in data or "ts" in data):
+                if "ts_unix" in data:
+                    age_seconds = time.time() - data["ts_unix"]
+                else:
+                    # Entries written before ts_unix was added
+                    cached_time = datetime.fromisoformat(data["ts"].replace("Z", "+00:00"))
+                    age_seconds = (datetime.now(timezone.utc) - cached_time).total_seconds()
 
                 if age_seconds > max_age_seconds:
                     logger.warning(
-                        f"Cached data for {key} is stale: {age_seconds:.1f}s > {max_age_seconds}s"
+                        "Cached data for %s is stale: %.1fs > %ss", key, age_seconds, max_age_seconds
                     )
                     return None
 
-            logger.debug(f"Cache hit for {key}")
+            logger.debug("Cache hit for %s", key)
             return data
 
         except Exception as e:
@@ -151,6 +295,7 @@ class CacheManager:
         beta: float,
         volatility: float,
         ttl: Optional[int] = None,
+        pipeline: Optional[Pipeline] = None,
     ) -> bool:
         """
         Store all risk metrics for a portfolio in a single operation.
@@ -163,12 +308,12 @@ class CacheManager:
             beta: Beta vs benchmark
             volatility: Portfolio volatility
             ttl: Time-to-live in seconds (uses default if None)
+            pipeline: Pipeline from CacheManager.pipeline() to queue the writes on
+                instead of sending them immediately (optional)
 
         Returns:
-            True if all metrics successfully cached, False otherwise
+            True if all metrics successfully cached (or queued), False otherwise
         """
-        ttl_seconds = ttl if ttl is not None else self.default_ttl
-
         metrics = {
             "VaR_95": var_95,
             "ES": expected_shortfall,
@@ -177,30 +322,212 @@ class CacheManager:
             "Volatility": volatility,
         }
 
+        if not self.set_metrics_batch(portfolio_id, metrics, ttl=ttl, pipeline=pipeline):
+            return False
+
+        logger.info(
+            "Cached all metrics for %s: VaR=%.6f, ES=%.6f, Sharpe=%.4f, Beta=%.4f, Vol=%.6f",
+            portfolio_id, var_95, expected_shortfall, sharpe_ratio, beta, volatility
+        )
+        return True
+
+    def set_metrics_batch(
+        self,
+        portfolio_id: str,
+        metrics: Dict[str, float],
+        ttl: Optional[int] = None,
+        pipeline: Optional[Pipeline] = None,
+    ) -> bool:
+        """
+        Store an arbitrary set of metrics for a portfolio in one pipelined round trip.
+
+        Args:
+            portfolio_id: Portfolio identifier
+            metrics: Mapping of metric type to value
+            ttl: Time-to-live in seconds (uses default if None)
+            pipeline: Pipeline from CacheManager.pipeline() to queue the writes on
+                instead of sending them immediately (optional)
+
+        Returns:
+            True if all metrics successfully cached (or queued), False otherwise
+
+        Example:
+            >>> cm = CacheManager()
+            >>> cm.set_metrics_batch("PORT_A_TechGrowth", {"VaR_95": -0.0231, "Beta": 1.12})
+        """
+        if self.use_hash:
+            return self.set_metrics_hash(portfolio_id, metrics, ttl=ttl, pipeline=pipeline)
+
+        ttl_seconds = ttl if ttl is not None else self.default_ttl
+        ts = datetime.now(timezone.utc).isoformat()
+        ts_unix = time.time()
+
         try:
-            pipeline = self.redis_client.pipeline()
+            pipe = pipeline
+            if pipe is None:
+                pipe = self.redis_client.pipeline(transaction=False)
 
             for metric_type, value in metrics.items():
                 key = self._build_key(metric_type, portfolio_id)
                 data = {
                     f"current_{metric_type}": value,
-                    "ts": datetime.now(timezone.utc).isoformat(),
+                    "ts": ts,
+                    "ts_unix": ts_unix,
                 }
-                pipeline.setex(name=key, time=ttl_seconds, value=json.dumps(data))
+                pipe.setex(name=key, time=ttl_seconds, value=self._dumps(data))
+
+            if pipeline is None:
+                pipe.execute()
+
+            logger.debug(
+                "Cached %d metrics for %s (TTL=%ss)", len(metrics), portfolio_id, ttl_seconds)
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to cache metrics for {portfolio_id}: {e}", exc_info=True)
+            return False
 
+    def set_metrics_hash(
+        self,
+        portfolio_id: str,
+        metrics: Dict[str, float],
+        ttl: Optional[int] = None,
+        pipeline: Optional[Pipeline] = None,
+    ) -> bool:
+        """
+        Store metrics as fields of the portfolio's Redis hash.
+
+        One small hash (listpack-encoded by Redis) replaces a JSON key per metric,
+        and a single HGETALL returns the full metric panel.
+
+        Args:
+            portfolio_id: Portfolio identifier
+            metrics: Mapping of metric type to value
+            ttl: Time-to-live in seconds (uses default if None)
+            pipeline: Pipeline from CacheManager.pipeline() to queue the writes on
+                instead of sending them immediately (optional)
+
+        Returns:
+            True if successfully cached (or queued), False otherwise
+
+        Example:
+            >>> cm = CacheManager(use_hash=True)
+            >>> cm.set_metrics_hash("PORT_A_TechGrowth", {"VaR_95": -0.0231, "Beta": 1.12})
+        """
+        key = self._hash_key(portfolio_id)
+        ttl_seconds = ttl if ttl is not None else self.default_ttl
+
+        mapping: Dict[str, Any] = {
+            metric_type: float(value) for metric_type, value in metrics.items()
+        }
+        mapping["ts"] = datetime.now(timezone.utc).isoformat()
+        mapping["ts_unix"] = time.time()
+
+        try:
+            pipe = pipeline
+            if pipe is None:
+                pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, ttl_seconds)
+            if pipeline is None:
+                pipe.execute()
+
+            logger.debug(
+                "Cached %d metrics in %s (TTL=%ss)", len(metrics), key, ttl_seconds)
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to cache metrics hash for {portfolio_id}: {e}", exc_info=True)
+            return False
+
+    def _metric_hash_key(self, metric_type: str, portfolio_id: str) -> str:
+        """
+        Build the Redis key of a single metric's JSON-free hash.
+
+        Format: <metric_type>:<portfolio_id>:hash
+
+        Args:
+            metric_type: Type of metric (VaR, Sharpe, Beta)
+            portfolio_id: Portfolio identifier
+
+        Returns:
+            Formatted Redis key string
+        """
+        return f"{self._build_key(metric_type, portfolio_id)}:hash"
+
+    def set_metric_hash(
+        self,
+        portfolio_id: str,
+        metric_type: str,
+        value: float,
+        ttl: Optional[int] = None,
+    ) -> bool:
+        """
+        Store a single metric as a two-field hash (v, ts) with no JSON encoding.
+
+        Args:
+            portfolio_id: Portfolio identifier
+            metric_type: Type of metric (VaR, Sharpe, Beta)
+            value: Metric value to cache
+            ttl: Time-to-live in seconds (uses default if None)
+
+        Returns:
+            True if successfully cached, False otherwise
+
+        Example:
+            >>> cm = CacheManager()
+            >>> cm.set_metric_hash("PORT_A_TechGrowth", "VaR", -0.0231)
+        """
+        key = self._metric_hash_key(metric_type, portfolio_id)
+        ttl_seconds = ttl if ttl is not None else self.default_ttl
+
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.hset(key, mapping={"v": float(value), "ts": int(time.time())})
+            pipeline.expire(key, ttl_seconds)
             pipeline.execute()
 
-            logger.info(
-                f"Cached all metrics for {portfolio_id}: "
-                f"VaR={var_95:.6f}, ES={expected_shortfall:.6f}, "
-                f"Sharpe={sharpe_ratio:.4f}, Beta={beta:.4f}, Vol={volatility:.6f}"
-            )
+            logger.debug(
+                "Cached %s for %s in %s (TTL=%ss)", metric_type, portfolio_id, key, ttl_seconds)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to cache all metrics for {portfolio_id}: {e}", exc_info=True)
+            logger.error(f"Failed to cache {metric_type} hash for {portfolio_id}: {e}", exc_info=True)
             return False
 
+    def get_metric_hash(
+        self, portfolio_id: str, metric_type: str, max_age_seconds: Optional[int] = None
+    ) -> Optional[Tuple[float, int]]:
+        """
+        Retrieve a metric stored by set_metric_hash.
+
+        Args:
+            portfolio_id: Portfolio identifier
+            metric_type: Type of metric (VaR, Sharpe, Beta)
+            max_age_seconds: Maximum acceptable age of cached data (optional)
+
+        Returns:
+            Tuple of (value, epoch-seconds timestamp), or None if not found/expired
+        """
+        key = self._metric_hash_key(metric_type, portfolio_id)
+
+        try:
+            value, ts = self.redis_client.hmget(key, ["v", "ts"])
+            if value is None:
+                logger.debug("Cache miss for %s", key)
+                return None
+
+            ts = int(ts)
+            if max_age_seconds is not None and time.time() - ts > max_age_seconds:
+                logger.warning("Cached data for %s is stale", key)
+                return None
+
+            return float(value), ts
+
+        except Exception as e:
+            logger.error(f"Failed to retrieve {metric_type} hash for {portfolio_id}: {e}", exc_info=True)
+            return None
+
     def set_alert(
         self,
         portfolio_id: str,
@@ -228,11 +555,11 @@ class CacheManager:
         ttl_seconds = ttl if ttl is not None else self.default_ttl
 
         try:
-            self.redis_client.hset(key, alert_name, str(is_triggered).lower())
-            self.redis_client.expire(key, ttl_seconds)
+            self._hset_expire(
+                keys=[key], args=[alert_name, str(is_triggered).lower(), ttl_seconds])
 
             logger.info(
-                f"Alert '{alert_name}' for {portfolio_id}: {is_triggered} (TTL={ttl_seconds}s)"
+                "Alert '%s' for %s: %s (TTL=%ss)", alert_name, portfolio_id, is_triggered, ttl_seconds
             )
             return True
 
@@ -300,6 +627,9 @@ class CacheManager:
         """
         metric_types = ["VaR_95", "ES", "Sharpe", "Beta", "Volatility", "Alert"]
         keys_to_delete = [self._build_key(mt, portfolio_id) for mt in metric_types]
+        keys_to_delete.extend(
+            self._metric_hash_key(mt, portfolio_id) for mt in metric_types[:-1])
+        keys_to_delete.append(self._hash_key(portfolio_id))
 
         try:
             deleted = self.redis_client.delete(*keys_to_delete)
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import logging
+import os
 import time
-from datetime import datetime, timezone
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -17,16 +20,52 @@ from config.mongodb_config import get_database, get_mongo_client
 from src.risk_engine.cache_manager import CacheManager
 from src.risk_engine.performance_metrics import (
     calculate_beta_from_dataframes,
-    calculate_rolling_volatility,
-    calculate_sharpe_ratio,
+    calculate_beta_from_returns,
+    calculate_benchmark_window_stats,
+    calculate_sharpe_ratio_from_returns,
+    calculate_volatility_from_returns,
+)
+from src.risk_engine.var_calculator import (
+    calculate_historical_var_and_es,
+    calculate_var_and_es,
 )
-from src.risk_engine.var_calculator import calculate_expected_shortfall, calculate_portfolio_var
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_WINDOW = 20
+# Calendar days loaded beyond the rolling window to cover weekends and holidays
+LOOKBACK_PADDING_DAYS = 30
+# Suggested location for the optional between-run returns cache
+RETURNS_CACHE_PATH = Path(__file__).resolve().parents[2] / "data" / "processed" / "returns.parquet"
+# Threads refreshing Redis while the backfill keeps computing and writing
+REDIS_CACHE_WORKERS = 4
+# Compound index shared by portfolio_holdings and risk_metrics
+PORTFOLIO_DATE_INDEX = [("portfolio_id", ASCENDING), ("date", DESCENDING)]
+# Fields needed to refresh the Redis cache from a risk_metrics document
+LATEST_METRICS_PROJECTION = {
+    "_id": 0,
+    "portfolio_id": 1,
+    "date": 1,
+    "VaR_95": 1,
+    "expected_shortfall": 1,
+    "sharpe_ratio_20d": 1,
+    "beta_vs_SPY_20d": 1,
+    "portfolio_volatility_20d": 1,
+}
+# Return rows per cursor batch when loading the backfill history
+PRICES_BATCH_SIZE = 5000
+# Metrics upserted per unordered bulk_write
+METRICS_BATCH_SIZE = 1000
+
+# Backfill inputs installed in each pool worker by _init_worker
+_worker_returns: Optional[pd.DataFrame] = None
+_worker_weights: Dict[Tuple[str, datetime], pd.Series] = {}
+# Benchmark window stats keyed by (date, benchmark, window), reset per backfill
+_benchmark_stats_cache: Dict[Tuple[datetime, str, int], Tuple[np.ndarray, float]] = {}
+
 
 def fetch_portfolio_dates(db, portfolio_id: Optional[str] = None) -> List[Dict[str, object]]:
     """
@@ -41,10 +80,13 @@ def fetch_portfolio_dates(db, portfolio_id: Optional[str] = None) -> List[Dict[s
     """
     query = {} if portfolio_id is None else {"portfolio_id": portfolio_id}
 
+    # Sort in index order and project only indexed fields so the planner can serve this
+    # from a covered scan of the (portfolio_id, date) index; no hint, so a missing index
+    # slows the backfill down instead of failing it
     pipeline = [
         {"$match": query},
+        {"$sort": {"portfolio_id": 1, "date": -1}},
         {"$project": {"portfolio_id": 1, "date": 1, "_id": 0}},
-        {"$sort": {"portfolio_id": 1, "date": 1}},
     ]
 
     snapshots = list(db.portfolio_holdings.aggregate(pipeline))
@@ -53,103 +95,239 @@ def fetch_portfolio_dates(db, portfolio_id: Optional[str] = None) -> List[Dict[s
     return snapshots
 
 
-def fetch_returns_window(db, end_date: datetime, lookback_days: int = 50) -> pd.DataFrame:
+def load_returns(
+    db, start_date: datetime, end_date: Optional[datetime] = None
+) -> pd.DataFrame:
     """
-    Fetch price data and compute returns for a lookback window.
+    Load daily returns for every ticker over a date range with a single aggregation.
+
+    Returns are computed server-side with $setWindowFields (MongoDB 5.0+), so only
+    one value per (date, ticker) crosses the wire. The backfill slices
+    per-snapshot windows out of this frame in memory instead of querying prices
+    once per snapshot.
 
     Args:
         db: MongoDB database instance
-        end_date: End date for the window (inclusive)
-        lookback_days: Number of days to look back (default 50 for 20-day rolling calculations)
+        start_date: First price date to load (inclusive)
+        end_date: Last price date to load (inclusive, optional)
 
     Returns:
-        DataFrame of daily returns indexed by date with tickers as columns
+        float32 DataFrame of daily returns indexed by date with tickers as columns,
+        forward filled with remaining gaps set to zero
     """
-    start_timestamp = end_date.timestamp() - (lookback_days * 86400)
-    start_date = datetime.fromtimestamp(start_timestamp, tz=timezone.utc)
+    date_filter: Dict[str, datetime] = {"$gte": start_date}
+    if end_date is not None:
+        date_filter["$lte"] = end_date
 
-    query = {"date": {"$gte": start_date, "$lte": end_date}}
+    pipeline = [
+        {"$match": {"date": date_filter}},
+        {
+            "$setWindowFields": {
+                "partitionBy": "$ticker",
+                "sortBy": {"date": 1},
+                "output": {"prev_close": {"$shift": {"output": "$close", "by": -1}}},
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "date": 1,
+                "ticker": 1,
+                # Null for each ticker's first row and for missing or zero prices
+                "ret": {
+                    "$cond": [
+                        {"$and": [{"$gt": ["$prev_close", 0]}, {"$ne": ["$close", None]}]},
+                        {"$subtract": [{"$divide": ["$close", "$prev_close"]}, 1]},
+                        None,
+                    ]
+                },
+            }
+        },
+    ]
+    cursor = db.prices.aggregate(pipeline, allowDiskUse=True, batchSize=PRICES_BATCH_SIZE)
 
-    price_docs = list(db.prices.find(query).sort("date", ASCENDING))
+    dates, tickers, daily_returns = [], [], []
+    for doc in cursor:
+        dates.append(doc["date"])
+        tickers.append(doc["ticker"])
+        daily_returns.append(doc.get("ret"))
 
-    if not price_docs:
-        logger.warning(f"No price data found between {start_date} and {end_date}")
+    if not dates:
+        logger.warning(f"No price data found from {start_date} to {end_date or 'latest'}")
         return pd.DataFrame()
 
-    prices_list = []
-    for doc in price_docs:
-        prices_list.append(
-            {
-                "date": doc["date"],
-                "ticker": doc["ticker"],
-                "close": doc.get("close", np.nan),
-            }
-        )
+    # Rows are placed by factorized (date, ticker) codes, so no sort is needed
+    date_codes, date_index = pd.factorize(pd.DatetimeIndex(dates), sort=True)
+    ticker_codes, ticker_index = pd.factorize(pd.Index(tickers), sort=True)
 
-    df = pd.DataFrame(prices_list)
-    prices_pivot = df.pivot(index="date", columns="ticker", values="close")
-    prices_pivot = prices_pivot.sort_index()
+    values = np.full((len(date_index), len(ticker_index)), np.nan)
+    values[date_codes, ticker_codes] = np.array(daily_returns, dtype=np.float64)
+    returns = pd.DataFrame(
+        values,
+        index=date_index.rename("date"),
+        columns=ticker_index.rename("ticker"),
+    )
 
-    returns = prices_pivot.pct_change().dropna(how="all")
+    # Impute once for the whole history rather than per snapshot window; float32 is
+    # ample for daily returns and halves memory traffic in the per-snapshot math
+    returns = returns.dropna(how="all").ffill().fillna(0).astype(np.float32)
 
-    logger.debug(
-        f"Fetched returns: {returns.shape[0]} days × {returns.shape[1]} tickers "
-        f"(window: {start_date.date()} to {end_date.date()})"
+    logger.info(
+        f"Loaded returns: {returns.shape[0]} days × {returns.shape[1]} tickers "
+        f"(from {returns.index[0].date()} to {returns.index[-1].date()})"
     )
 
     return returns
 
 
-def fetch_portfolio_weights(db, portfolio_id: str, date: datetime) -> pd.Series:
+def _load_or_build_returns(
+    db, start_date: datetime, end_date: datetime, cache_path: Optional[Path] = None
+) -> pd.DataFrame:
     """
-    Fetch portfolio weights for a specific date.
+    Load backfill returns from a local parquet cache, rebuilding it from MongoDB when stale.
+
+    The cache records the date range it was built for and is reused only when that
+    range covers the requested one, so reruns skip the price query and pivot.
 
     Args:
         db: MongoDB database instance
-        portfolio_id: Portfolio identifier
-        date: Snapshot date
+        start_date: First price date required (inclusive)
+        end_date: Last price date required (inclusive)
+        cache_path: Parquet file to read and refresh (optional, no caching if None)
+
+    Returns:
+        Returns DataFrame as produced by load_returns
+    """
+    if cache_path is not None and cache_path.exists():
+        cached = pd.read_parquet(cache_path)
+        cached_start = cached.attrs.get("start_date")
+        cached_end = cached.attrs.get("end_date")
+        if (
+            cached_start is not None
+            and cached_end is not None
+            and datetime.fromisoformat(cached_start) <= start_date
+            and datetime.fromisoformat(cached_end) >= end_date
+        ):
+            logger.info(f"Loaded cached returns from {cache_path}")
+            return cached
+
+    returns = load_returns(db, start_date, end_date)
+
+    if cache_path is not None and not returns.empty:
+        returns.attrs["start_date"] = start_date.isoformat()
+        returns.attrs["end_date"] = end_date.isoformat()
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        returns.to_parquet(cache_path, compression="zstd")
+        logger.info(f"Cached returns to {cache_path}")
+
+    return returns
+
+
+def slice_returns(
+    returns_full: pd.DataFrame, end_date: datetime, lookback_days: int = 50
+) -> pd.DataFrame:
+    """
+    Slice a lookback window out of a preloaded returns DataFrame.
+
+    Args:
+        returns_full: Returns DataFrame from load_returns
+        end_date: End date for the window (inclusive)
+        lookback_days: Number of days to look back (default 50 for 20-day rolling calculations)
 
     Returns:
-        Series of weights indexed by ticker
+        DataFrame of daily returns indexed by date with tickers as columns
     """
-    snapshot = db.portfolio_holdings.find_one(
-        {"portfolio_id": portfolio_id, "date": date}, {"assets": 1, "_id": 0}
+    if returns_full.empty:
+        return returns_full
+
+    end = pd.Timestamp(end_date)
+    if end.tzinfo is not None and returns_full.index.tz is None:
+        end = end.tz_convert("UTC").tz_localize(None)
+    start = end - pd.Timedelta(days=lookback_days)
+
+    return returns_full.loc[start:end]
+
+
+def fetch_portfolio_weights(
+    db, portfolio_ids: Iterable[str], tolerance: float = 1e-4
+) -> Dict[Tuple[str, datetime], pd.Series]:
+    """
+    Fetch and validate portfolio weights for every snapshot of the given portfolios.
+
+    Weights are checked once here (long-only, summing to 1.0) so the per-snapshot
+    computation does not repeat the validation. Invalid snapshots are left out and
+    later count as failed.
+
+    Args:
+        db: MongoDB database instance
+        portfolio_ids: Portfolio identifiers to load holdings for
+        tolerance: Acceptable deviation from weight sum of 1.0
+
+    Returns:
+        Dictionary mapping (portfolio_id, date) to a Series of weights indexed by ticker
+    """
+    cursor = db.portfolio_holdings.find(
+        {"portfolio_id": {"$in": list(portfolio_ids)}},
+        {"portfolio_id": 1, "date": 1, "assets": 1, "_id": 0},
     )
 
-    if not snapshot or "assets" not in snapshot:
-        raise ValueError(f"No holdings found for {portfolio_id} on {date.date()}")
+    weights_cache: Dict[Tuple[str, datetime], pd.Series] = {}
+    for snapshot in cursor:
+        assets = snapshot.get("assets")
+        if not assets:
+            continue
+        weights = pd.Series({asset["ticker"]: asset["weight"] for asset in assets})
+
+        weight_sum = weights.sum()
+        if not np.isclose(weight_sum, 1.0, atol=tolerance) or (weights < 0).any():
+            logger.warning(
+                f"Skipping holdings for {snapshot['portfolio_id']} on {snapshot['date'].date()}: "
+                f"weights sum to {weight_sum:.6f} or include negative positions"
+            )
+            continue
+
+        weights_cache[(snapshot["portfolio_id"], snapshot["date"])] = weights
 
-    weights = {asset["ticker"]: asset["weight"] for asset in snapshot["assets"]}
+    logger.info(f"Loaded weights for {len(weights_cache)} portfolio snapshots")
 
-    return pd.Series(weights)
+    return weights_cache
 
 
 def compute_metrics_for_snapshot(
-    db,
+    returns_full: pd.DataFrame,
+    weights_cache: Dict[Tuple[str, datetime], pd.Series],
     portfolio_id: str,
     snapshot_date: datetime,
     benchmark_ticker: str = "SPY",
     n_simulations: int = 1000,
     confidence_level: float = 0.95,
-    window: int = 20,
+    window: int = DEFAULT_WINDOW,
+    var_method: str = "historical",
 ) -> Optional[Dict[str, object]]:
     """
     Compute all risk metrics for a single portfolio snapshot.
 
     Args:
-        db: MongoDB database instance
+        returns_full: Preloaded, gap-filled returns from load_returns covering the
+            snapshot's lookback window
+        weights_cache: Preloaded weights from fetch_portfolio_weights keyed by
+            (portfolio_id, date)
         portfolio_id: Portfolio identifier
         snapshot_date: Date of the portfolio snapshot
         benchmark_ticker: Benchmark for beta calculation (default SPY)
-        n_simulations: Number of Monte Carlo simulations for VaR
+        n_simulations: Number of Monte Carlo simulations for VaR (monte_carlo method only)
         confidence_level: Confidence level for VaR and ES
         window: Rolling window size for Sharpe, Beta, Volatility
+        var_method: "historical" takes the empirical quantile of the window's portfolio
+            returns; "monte_carlo" bootstraps n_simulations resampled days
 
     Returns:
         Dictionary with all computed metrics, or None if computation fails
     """
     try:
-        returns = fetch_returns_window(db, snapshot_date, lookback_days=window + 30)
+        returns = slice_returns(
+            returns_full, snapshot_date, lookback_days=window + LOOKBACK_PADDING_DAYS
+        )
 
         if returns.empty or len(returns) < window:
             logger.warning(
@@ -158,23 +336,64 @@ def compute_metrics_for_snapshot(
             )
             return None
 
-        weights = fetch_portfolio_weights(db, portfolio_id, snapshot_date)
+        weights = weights_cache.get((portfolio_id, snapshot_date))
+        if weights is None:
+            raise ValueError(f"No holdings found for {portfolio_id} on {snapshot_date.date()}")
 
-        var_95 = calculate_portfolio_var(
-            returns, weights, confidence_level=confidence_level, n_simulations=n_simulations
-        )
+        # Weights were validated when loaded; only their tickers need resolving here
+        columns = returns.columns.get_indexer(weights.index)
+        if (columns < 0).any():
+            raise ValueError(
+                f"Weights contain tickers not in returns: {set(weights.index[columns < 0])}"
+            )
 
-        expected_shortfall = calculate_expected_shortfall(
-            returns, weights, confidence_level=confidence_level, n_simulations=n_simulations
+        if benchmark_ticker not in returns.columns:
+            raise ValueError(
+                f"Benchmark ticker '{benchmark_ticker}' not found in returns DataFrame"
+            )
+
+        # Returns are gap-filled at load time; combine once for every metric
+        returns_values = returns.to_numpy()
+        portfolio_returns = returns_values[:, columns] @ weights.to_numpy(
+            dtype=returns_values.dtype
         )
 
-        sharpe_ratio = calculate_sharpe_ratio(returns, weights, window=window)
+        if var_method == "historical":
+            var_95, expected_shortfall = calculate_historical_var_and_es(
+                portfolio_returns, confidence_level=confidence_level
+            )
+        elif var_method == "monte_carlo":
+            var_95, expected_shortfall = calculate_var_and_es(
+                returns,
+                weights,
+                confidence_level=confidence_level,
+                n_simulations=n_simulations,
+            )
+        else:
+            raise ValueError(f"Unknown VaR method '{var_method}'")
 
-        beta = calculate_beta_from_dataframes(
-            returns, weights, benchmark_ticker=benchmark_ticker, window=window
-        )
+        sharpe_ratio = calculate_sharpe_ratio_from_returns(portfolio_returns, window=window)
+
+        if benchmark_ticker in weights.index:
+            beta = calculate_beta_from_dataframes(
+                returns, weights, benchmark_ticker=benchmark_ticker, window=window
+            )
+        else:
+            benchmark_returns = returns_values[:, returns.columns.get_loc(benchmark_ticker)]
+            # Portfolios on the same date share the benchmark window; compute it once
+            stats_key = (snapshot_date, benchmark_ticker, window)
+            benchmark_stats = _benchmark_stats_cache.get(stats_key)
+            if benchmark_stats is None:
+                benchmark_stats = calculate_benchmark_window_stats(benchmark_returns, window)
+                _benchmark_stats_cache[stats_key] = benchmark_stats
+            beta = calculate_beta_from_returns(
+                portfolio_returns,
+                benchmark_returns,
+                window=window,
+                benchmark_stats=benchmark_stats,
+            )
 
-        volatility = calculate_rolling_volatility(returns, weights, window=window)
+        volatility = calculate_volatility_from_returns(portfolio_returns, window=window)
 
         if sharpe_ratio is None or beta is None or volatility is None:
             logger.warning(f"Some metrics unavailable for {portfolio_id} on {snapshot_date.date()}")
@@ -189,18 +408,20 @@ def compute_metrics_for_snapshot(
             "beta_vs_SPY_20d": beta,
             "portfolio_volatility_20d": volatility,
             "simulation_params": {
-                "n_simulations": n_simulations,
+                "n_simulations": n_simulations if var_method == "monte_carlo" else None,
                 "confidence_level": confidence_level,
-                "method": "historical_monte_carlo",
+                "method": (
+                    "historical_monte_carlo" if var_method == "monte_carlo" else "historical"
+                ),
                 "window": window,
             },
             "computed_at": datetime.now(timezone.utc),
         }
 
         logger.debug(
-            f"Computed metrics for {portfolio_id} on {snapshot_date.date()}: "
-            f"VaR={var_95:.6f}, ES={expected_shortfall:.6f}, Sharpe={sharpe_ratio:.4f}, "
-            f"Beta={beta:.4f}, Vol={volatility:.6f}"
+            "Computed metrics for %s on %s: VaR=%.6f, ES=%.6f, Sharpe=%.4f, Beta=%.4f, Vol=%.6f",
+            portfolio_id, snapshot_date.date(), var_95, expected_shortfall, sharpe_ratio,
+            beta, volatility
         )
 
         return metrics
@@ -216,27 +437,44 @@ def compute_metrics_for_snapshot(
 def ensure_risk_metrics_index(db) -> None:
     """Create index on risk_metrics collection if it doesn't exist."""
     db.risk_metrics.create_index(
-        [("portfolio_id", ASCENDING), ("date", DESCENDING)],
+        PORTFOLIO_DATE_INDEX,
         name="idx_risk_metrics_portfolio_date",
     )
     logger.info("Ensured risk_metrics index exists")
 
 
-def bulk_insert_metrics(db, metrics_list: List[Dict[str, object]]) -> int:
+def bulk_insert_metrics(
+    db, metrics_list: List[Dict[str, object]], mode: Literal["insert", "upsert"] = "upsert"
+) -> int:
     """
     Bulk insert or update risk metrics in MongoDB.
 
     Args:
         db: MongoDB database instance
         metrics_list: List of metrics dictionaries to insert
+        mode: "upsert" matches existing documents on (portfolio_id, date);
+            "insert" uses insert_many and assumes no matching documents exist
 
     Returns:
-        Number of documents upserted
+        Number of documents upserted or inserted
     """
     if not metrics_list:
         logger.warning("No metrics to insert")
         return 0
 
+    if mode == "insert":
+        try:
+            result = db.risk_metrics.insert_many(
+                metrics_list, ordered=False, bypass_document_validation=True
+            )
+            inserted_count = len(result.inserted_ids)
+            logger.info(f"Bulk insert: {inserted_count} risk metrics inserted")
+            return inserted_count
+
+        except Exception as e:
+            logger.error(f"Bulk insert failed: {e}", exc_info=True)
+            return 0
+
     requests = []
     for metrics in metrics_list:
         filter_query = {
@@ -246,7 +484,9 @@ def bulk_insert_metrics(db, metrics_list: List[Dict[str, object]]) -> int:
         requests.append(UpdateOne(filter_query, {"$set": metrics}, upsert=True))
 
     try:
-        result = db.risk_metrics.bulk_write(requests, ordered=False)
+        result = db.risk_metrics.bulk_write(
+            requests, ordered=False, bypass_document_validation=True
+        )
         upserted_count = result.upserted_count + result.modified_count
         logger.info(f"Bulk insert: {upserted_count} risk metrics upserted")
         return upserted_count
@@ -256,65 +496,180 @@ def bulk_insert_metrics(db, metrics_list: List[Dict[str, object]]) -> int:
         return 0
 
 
+def fetch_latest_metrics(db, portfolio_ids: Iterable[str]) -> Dict[str, Dict[str, object]]:
+    """
+    Fetch the most recent risk metrics document for each portfolio in one aggregation.
+
+    Args:
+        db: MongoDB database instance
+        portfolio_ids: Portfolio identifiers to look up
+
+    Returns:
+        Dictionary mapping portfolio_id to its latest metrics, limited to the cached fields
+    """
+    pipeline = [
+        {"$match": {"portfolio_id": {"$in": list(portfolio_ids)}}},
+        {"$sort": {"portfolio_id": 1, "date": -1}},
+        {"$project": LATEST_METRICS_PROJECTION},
+        {"$group": {"_id": "$portfolio_id", "latest": {"$first": "$$ROOT"}}},
+    ]
+
+    return {doc["_id"]: doc["latest"] for doc in db.risk_metrics.aggregate(pipeline)}
+
+
 def update_redis_cache_for_latest(
     cache_manager: CacheManager,
     db,
-    portfolio_id: str,
-) -> bool:
+    portfolio_ids: Iterable[str],
+) -> int:
     """
-    Update Redis cache with latest metrics for a portfolio.
+    Update Redis cache with latest metrics for a set of portfolios.
 
     Args:
         cache_manager: CacheManager instance
         db: MongoDB database instance
-        portfolio_id: Portfolio identifier
+        portfolio_ids: Portfolio identifiers to refresh
 
     Returns:
-        True if cache updated successfully, False otherwise
+        Number of portfolios whose cache was updated successfully
     """
+    portfolio_ids = list(portfolio_ids)
+
     try:
-        latest_metrics = db.risk_metrics.find_one(
-            {"portfolio_id": portfolio_id},
-            sort=[("date", DESCENDING)],
-        )
+        latest_by_portfolio = fetch_latest_metrics(db, portfolio_ids)
+    except Exception as e:
+        logger.error(f"Failed to fetch latest metrics for Redis cache: {e}", exc_info=True)
+        return 0
 
-        if not latest_metrics:
-            logger.warning(f"No metrics found for {portfolio_id} to cache")
-            return False
-
-        success = cache_manager.set_all_metrics(
-            portfolio_id=portfolio_id,
-            var_95=latest_metrics["VaR_95"],
-            expected_shortfall=latest_metrics["expected_shortfall"],
-            sharpe_ratio=latest_metrics["sharpe_ratio_20d"],
-            beta=latest_metrics["beta_vs_SPY_20d"],
-            volatility=latest_metrics["portfolio_volatility_20d"],
-        )
+    queued = []
+    try:
+        # One pipeline carries every portfolio's writes in a single round trip
+        with cache_manager.pipeline() as pipeline:
+            for portfolio_id in portfolio_ids:
+                latest_metrics = latest_by_portfolio.get(portfolio_id)
+
+                if not latest_metrics:
+                    logger.warning(f"No metrics found for {portfolio_id} to cache")
+                    continue
+
+                if cache_manager.set_all_metrics(
+                    portfolio_id=portfolio_id,
+                    var_95=latest_metrics["VaR_95"],
+                    expected_shortfall=latest_metrics["expected_shortfall"],
+                    sharpe_ratio=latest_metrics["sharpe_ratio_20d"],
+                    beta=latest_metrics["beta_vs_SPY_20d"],
+                    volatility=latest_metrics["portfolio_volatility_20d"],
+                    pipeline=pipeline,
+                ):
+                    queued.append((portfolio_id, latest_metrics["date"]))
 
-        if success:
-            logger.info(
-                f"Updated Redis cache for {portfolio_id} with metrics from {latest_metrics['date'].date()}"
-            )
+    except Exception as e:
+        logger.error(f"Failed to update Redis cache for {portfolio_ids}: {e}", exc_info=True)
+        return 0
 
-        return success
+    for portfolio_id, latest_date in queued:
+        logger.info(f"Updated Redis cache for {portfolio_id} with metrics from {latest_date.date()}")
 
-    except Exception as e:
-        logger.error(f"Failed to update Redis cache for {portfolio_id}: {e}", exc_info=True)
-        return False
+    return len(queued)
+
+
+def _init_worker(
+    returns_full: pd.DataFrame, weights_cache: Dict[Tuple[str, datetime], pd.Series]
+) -> None:
+    """Store the shared backfill inputs in a pool worker's module globals."""
+    global _worker_returns, _worker_weights
+    _worker_returns = returns_full
+    _worker_weights = weights_cache
+    _benchmark_stats_cache.clear()
+
+
+def _compute_snapshot_in_worker(
+    portfolio_id: str, snapshot_date: datetime, var_method: str
+) -> Optional[Dict[str, object]]:
+    """Compute one snapshot's metrics from the inputs installed by _init_worker."""
+    return compute_metrics_for_snapshot(
+        _worker_returns, _worker_weights, portfolio_id, snapshot_date, var_method=var_method
+    )
+
+
+def _iter_snapshot_metrics(
+    snapshots: List[Dict[str, object]],
+    returns_full: pd.DataFrame,
+    weights_cache: Dict[Tuple[str, datetime], pd.Series],
+    max_workers: Optional[int],
+    var_method: str = "historical",
+) -> Iterator[Tuple[str, Optional[Dict[str, object]]]]:
+    """
+    Yield each snapshot's portfolio_id and metrics, in completion order when run in parallel.
+
+    Args:
+        snapshots: Snapshot dictionaries with portfolio_id and date fields
+        returns_full: Preloaded returns DataFrame
+        weights_cache: Preloaded weights keyed by (portfolio_id, date)
+        max_workers: Worker processes (None uses every CPU, 1 computes in-process)
+        var_method: VaR/ES method passed to compute_metrics_for_snapshot
+
+    Yields:
+        Tuple of portfolio_id and metrics dictionary, or None if the computation failed
+    """
+    if max_workers == 1:
+        for snapshot in snapshots:
+            yield snapshot["portfolio_id"], compute_metrics_for_snapshot(
+                returns_full,
+                weights_cache,
+                snapshot["portfolio_id"],
+                snapshot["date"],
+                var_method=var_method,
+            )
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(returns_full, weights_cache),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _compute_snapshot_in_worker,
+                snapshot["portfolio_id"],
+                snapshot["date"],
+                var_method,
+            ): snapshot["portfolio_id"]
+            for snapshot in snapshots
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
 
 
 def compute_all_historical_metrics(
-    batch_size: int = 50,
+    batch_size: int = METRICS_BATCH_SIZE,
     portfolio_id: Optional[str] = None,
     update_cache: bool = True,
+    max_workers: Optional[int] = None,
+    cold_load: bool = False,
+    var_method: str = "historical",
+    returns_cache_path: Optional[Path] = None,
 ) -> Dict[str, int]:
     """
     Compute risk metrics for all portfolio snapshots and persist to MongoDB + Redis.
 
+    Snapshots are independent, so they are computed across a process pool; each
+    worker receives the preloaded returns and weights once through the pool
+    initializer rather than with every task.
+
     Args:
-        batch_size: Number of snapshots to process before bulk insert (default 50)
+        batch_size: Number of snapshots to process before bulk insert (default 1000)
         portfolio_id: Process only specific portfolio (optional, processes all if None)
         update_cache: Whether to update Redis cache with latest metrics (default True)
+        max_workers: Worker processes (default one per CPU, 1 disables the pool)
+        cold_load: Drop the risk_metrics secondary indexes for the run and rebuild them once
+            at the end (also on failure) instead of maintaining them per write. Writes are
+            plain inserts when risk_metrics starts empty, upserts otherwise, so stored
+            metrics are never discarded. Ignored for single-portfolio runs, which would
+            strip the shared index from every other portfolio
+        var_method: "historical" (default) or "monte_carlo" VaR/ES estimation
+        returns_cache_path: Parquet file caching the loaded returns between reruns, e.g.
+            RETURNS_CACHE_PATH (optional, always reads prices from MongoDB if None)
 
     Returns:
         Dictionary with statistics (total_processed, successful, failed, cached)
@@ -329,53 +684,114 @@ def compute_all_historical_metrics(
         logger.warning("Redis health check failed - caching disabled")
         cache_manager = None
 
-    ensure_risk_metrics_index(db)
-
-    snapshots = fetch_portfolio_dates(db, portfolio_id=portfolio_id)
+    if cold_load and portfolio_id is not None:
+        logger.warning("cold_load ignored for single-portfolio backfill of %s", portfolio_id)
+        cold_load = False
+
+    write_mode = "upsert"
+    if cold_load:
+        # Inserts are only safe when no (portfolio_id, date) document can already exist
+        if db.risk_metrics.estimated_document_count() == 0:
+            write_mode = "insert"
+    else:
+        ensure_risk_metrics_index(db)
+
+    # Date-major order lets each worker reuse a date's benchmark stats across portfolios
+    snapshots = sorted(
+        fetch_portfolio_dates(db, portfolio_id=portfolio_id),
+        key=lambda snapshot: (snapshot["date"], snapshot["portfolio_id"]),
+    )
 
     total_snapshots = len(snapshots)
+
+    returns_full = pd.DataFrame()
+    if snapshots:
+        first_date = snapshots[0]["date"]
+        last_date = snapshots[-1]["date"]
+        lookback = timedelta(days=DEFAULT_WINDOW + LOOKBACK_PADDING_DAYS)
+        returns_full = _load_or_build_returns(
+            db, first_date - lookback, last_date, cache_path=returns_cache_path
+        )
+
+    weights_cache = fetch_portfolio_weights(
+        db, {snapshot["portfolio_id"] for snapshot in snapshots}
+    )
+    _benchmark_stats_cache.clear()
+
     metrics_buffer = []
     successful = 0
     failed = 0
     processed_portfolios = set()
+    # Snapshots still outstanding per portfolio; once a portfolio reaches zero and
+    # its metrics are flushed, its Redis refresh can overlap the rest of the backfill
+    remaining_snapshots = Counter(snapshot["portfolio_id"] for snapshot in snapshots)
+    ready_to_cache: List[str] = []
+    cache_futures = []
 
     logger.info(f"Starting historical backfill for {total_snapshots} snapshots")
 
-    for idx, snapshot in enumerate(snapshots, start=1):
-        portfolio_id_curr = snapshot["portfolio_id"]
-        snapshot_date = snapshot["date"]
-
-        metrics = compute_metrics_for_snapshot(db, portfolio_id_curr, snapshot_date)
+    results = _iter_snapshot_metrics(
+        snapshots, returns_full, weights_cache, max_workers, var_method=var_method
+    )
 
-        if metrics:
-            metrics_buffer.append(metrics)
-            successful += 1
-            processed_portfolios.add(portfolio_id_curr)
-        else:
-            failed += 1
-
-        if len(metrics_buffer) >= batch_size:
-            bulk_insert_metrics(db, metrics_buffer)
-            metrics_buffer = []
-
-        if idx % 50 == 0:
-            elapsed = time.time() - start_time
-            rate = idx / elapsed
-            eta_seconds = (total_snapshots - idx) / rate if rate > 0 else 0
-            logger.info(
-                f"Progress: {idx}/{total_snapshots} ({idx/total_snapshots*100:.1f}%) | "
-                f"Success: {successful}, Failed: {failed} | "
-                f"Rate: {rate:.2f} snapshots/sec | ETA: {eta_seconds/60:.1f} min"
+    if cold_load:
+        db.risk_metrics.drop_indexes()
+
+    with ThreadPoolExecutor(max_workers=REDIS_CACHE_WORKERS) as cache_executor:
+        try:
+            for idx, (portfolio_id_curr, metrics) in enumerate(results, start=1):
+                if metrics:
+                    metrics_buffer.append(metrics)
+                    successful += 1
+                    processed_portfolios.add(portfolio_id_curr)
+                else:
+                    failed += 1
+
+                remaining_snapshots[portfolio_id_curr] -= 1
+                if (
+                    remaining_snapshots[portfolio_id_curr] == 0
+                    and portfolio_id_curr in processed_portfolios
+                ):
+                    ready_to_cache.append(portfolio_id_curr)
+
+                if len(metrics_buffer) >= batch_size:
+                    bulk_insert_metrics(db, metrics_buffer, mode=write_mode)
+                    metrics_buffer = []
+
+                    # Cold loads have no index until the end, so their refresh waits
+                    if cache_manager and ready_to_cache and not cold_load:
+                        cache_futures.append(
+                            cache_executor.submit(
+                                update_redis_cache_for_latest, cache_manager, db, ready_to_cache
+                            )
+                        )
+                        ready_to_cache = []
+
+                if idx % 50 == 0:
+                    elapsed = time.time() - start_time
+                    rate = idx / elapsed
+                    eta_seconds = (total_snapshots - idx) / rate if rate > 0 else 0
+                    logger.info(
+                        f"Progress: {idx}/{total_snapshots} ({idx/total_snapshots*100:.1f}%) | "
+                        f"Success: {successful}, Failed: {failed} | "
+                        f"Rate: {rate:.2f} snapshots/sec | ETA: {eta_seconds/60:.1f} min"
+                    )
+
+            if metrics_buffer:
+                bulk_insert_metrics(db, metrics_buffer, mode=write_mode)
+        finally:
+            # Dashboard queries rely on the index, so restore it even if the backfill fails
+            if cold_load:
+                ensure_risk_metrics_index(db)
+
+        if cache_manager and ready_to_cache:
+            cache_futures.append(
+                cache_executor.submit(
+                    update_redis_cache_for_latest, cache_manager, db, ready_to_cache
+                )
             )
 
-    if metrics_buffer:
-        bulk_insert_metrics(db, metrics_buffer)
-
-    cached_portfolios = 0
-    if cache_manager:
-        for portfolio_id_to_cache in processed_portfolios:
-            if update_redis_cache_for_latest(cache_manager, db, portfolio_id_to_cache):
-                cached_portfolios += 1
+        cached_portfolios = sum(future.result() for future in cache_futures)
 
     elapsed_total = time.time() - start_time
 
@@ -399,7 +815,7 @@ def main() -> None:
     logger.info("=== Phase 2: Historical Risk Metrics Computation ===")
 
     stats = compute_all_historical_metrics(
-        batch_size=50,
+        batch_size=METRICS_BATCH_SIZE,
         portfolio_id=None,
         update_cache=True,
     )
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -58,27 +58,58 @@ def calculate_sharpe_ratio(
             f"Portfolio weights sum to {weight_sum:.6f}, expected 1.0 (tolerance: 1e-4)"
         )
 
+    returns_filled = returns.ffill().fillna(0)
+    aligned_returns = returns_filled[weights.index]
+
+    portfolio_returns = aligned_returns.to_numpy() @ weights.to_numpy()
+
+    return calculate_sharpe_ratio_from_returns(
+        portfolio_returns,
+        risk_free_rate=risk_free_rate,
+        window=window,
+        annualization_factor=annualization_factor,
+    )
+
+
+def calculate_sharpe_ratio_from_returns(
+    portfolio_returns: np.ndarray,
+    risk_free_rate: float = 0.0,
+    window: int = 20,
+    annualization_factor: float = np.sqrt(252),
+) -> Optional[float]:
+    """
+    Calculate annualized Sharpe ratio from precomputed portfolio returns.
+
+    Args:
+        portfolio_returns: 1-D array of daily portfolio returns, oldest first, without NaN
+        risk_free_rate: Daily risk-free rate (default 0.0)
+        window: Rolling window size in days (default 20)
+        annualization_factor: Factor to annualize (default sqrt(252))
+
+    Returns:
+        Annualized Sharpe ratio over the latest window, or None if insufficient data
+
+    Raises:
+        ValueError: If window is smaller than 2
+    """
     if window < 2:
         raise ValueError(f"Window must be at least 2 days, got {window}")
 
-    if len(returns) < window:
+    if len(portfolio_returns) < window:
         logger.warning(
-            f"Insufficient data for Sharpe calculation: {len(returns)} days < {window} window"
+            f"Insufficient data for Sharpe calculation: {len(portfolio_returns)} days < {window} window"
         )
         return None
 
-    returns_filled = returns.ffill().fillna(0)
-    aligned_returns = returns_filled[weights.index]
-
-    portfolio_returns = aligned_returns @ weights.values
+    # Only the latest window is reported, so skip the full rolling computation
+    tail = portfolio_returns[-window:]
+    latest_mean = tail.mean()
+    # Reuse the mean for the deviations instead of letting std() recompute it;
+    # match pandas rolling: a constant window has exactly zero deviation
+    tail_dev = tail - latest_mean
+    latest_std = 0.0 if np.ptp(tail) == 0 else np.sqrt((tail_dev @ tail_dev) / (window - 1))
 
-    rolling_mean = portfolio_returns.rolling(window=window).mean()
-    rolling_std = portfolio_returns.rolling(window=window).std()
-
-    latest_mean = rolling_mean.iloc[-1]
-    latest_std = rolling_std.iloc[-1]
-
-    if pd.isna(latest_mean) or pd.isna(latest_std):
+    if np.isnan(latest_mean) or np.isnan(latest_std):
         logger.warning("Rolling statistics contain NaN - insufficient data")
         return None
 
@@ -90,8 +121,8 @@ def calculate_sharpe_ratio(
     sharpe_ratio = (excess_return / latest_std) * annualization_factor
 
     logger.info(
-        f"Sharpe ratio calculated: {sharpe_ratio:.4f} "
-        f"(window={window}d, mean={latest_mean:.6f}, std={latest_std:.6f})"
+        "Sharpe ratio calculated: %.4f (window=%sd, mean=%.6f, std=%.6f)",
+        sharpe_ratio, window, latest_mean, latest_std
     )
 
     return float(sharpe_ratio)
@@ -161,7 +192,8 @@ def calculate_beta(
     beta = latest_cov / latest_var
 
     logger.info(
-        f"Beta calculated: {beta:.4f} (window={window}d, cov={latest_cov:.6f}, var={latest_var:.6f})"
+        "Beta calculated: %.4f (window=%sd, cov=%.6f, var=%.6f)",
+        beta, window, latest_cov, latest_var
     )
 
     return float(beta)
@@ -220,11 +252,98 @@ def calculate_beta_from_dataframes(
         portfolio_weights = portfolio_weights / weight_sum
 
     aligned_returns = returns_filled[portfolio_weights.index]
-    portfolio_returns = aligned_returns @ portfolio_weights.values
+    portfolio_returns = aligned_returns.to_numpy() @ portfolio_weights.to_numpy()
+
+    benchmark_returns = returns_filled[benchmark_ticker].to_numpy()
+
+    # Both series come from the same filled frame, so no alignment is needed
+    return calculate_beta_from_returns(portfolio_returns, benchmark_returns, window=window)
+
+
+def calculate_benchmark_window_stats(
+    benchmark_returns: np.ndarray, window: int = 20
+) -> Tuple[np.ndarray, float]:
+    """
+    Compute the centered latest window and sample variance of benchmark returns.
+
+    Every portfolio evaluated on the same date shares these, so callers can compute
+    them once per date and pass them to calculate_beta_from_returns.
+
+    Args:
+        benchmark_returns: 1-D array of benchmark returns, oldest first, without NaN
+        window: Rolling window size in days (default 20)
+
+    Returns:
+        Tuple of (benchmark deviations from the window mean, sample variance)
+    """
+    benchmark_tail = benchmark_returns[-window:]
+    benchmark_dev = benchmark_tail - benchmark_tail.mean()
+    # Match pandas rolling: a constant benchmark window has exactly zero variance
+    if np.ptp(benchmark_tail) == 0:
+        return benchmark_dev, 0.0
+    return benchmark_dev, float(benchmark_dev @ benchmark_dev) / (window - 1)
+
 
-    benchmark_returns = returns_filled[benchmark_ticker]
+def calculate_beta_from_returns(
+    portfolio_returns: np.ndarray,
+    benchmark_returns: np.ndarray,
+    window: int = 20,
+    benchmark_stats: Optional[Tuple[np.ndarray, float]] = None,
+) -> Optional[float]:
+    """
+    Calculate beta over the latest window of date-aligned portfolio and benchmark returns.
 
-    return calculate_beta(portfolio_returns, benchmark_returns, window=window)
+    Args:
+        portfolio_returns: 1-D array of daily portfolio returns, oldest first, without NaN
+        benchmark_returns: 1-D array of benchmark returns on the same dates
+        window: Rolling window size in days (default 20)
+        benchmark_stats: Precomputed calculate_benchmark_window_stats result for the
+            same benchmark window (optional, computed here if None)
+
+    Returns:
+        Beta coefficient (e.g., 1.12), or None if insufficient data
+
+    Raises:
+        ValueError: If window is smaller than 2 or the arrays differ in length
+    """
+    if window < 2:
+        raise ValueError(f"Window must be at least 2 days, got {window}")
+
+    if len(portfolio_returns) != len(benchmark_returns):
+        raise ValueError(
+            f"Portfolio and benchmark returns differ in length: "
+            f"{len(portfolio_returns)} != {len(benchmark_returns)}"
+        )
+
+    if len(portfolio_returns) < window:
+        logger.warning(
+            f"Insufficient data for beta calculation: {len(portfolio_returns)} days < {window} window"
+        )
+        return None
+
+    if benchmark_stats is None:
+        benchmark_stats = calculate_benchmark_window_stats(benchmark_returns, window)
+    benchmark_dev, latest_var = benchmark_stats
+
+    if latest_var == 0:
+        logger.warning("Zero benchmark variance - cannot compute beta")
+        return None
+
+    # The benchmark deviations sum to zero, so the portfolio side needs no centering
+    latest_cov = (portfolio_returns[-window:] @ benchmark_dev) / (window - 1)
+
+    if np.isnan(latest_cov) or np.isnan(latest_var):
+        logger.warning("Rolling covariance/variance contain NaN - insufficient data")
+        return None
+
+    beta = latest_cov / latest_var
+
+    logger.info(
+        "Beta calculated: %.4f (window=%sd, cov=%.6f, var=%.6f)",
+        beta, window, latest_cov, latest_var
+    )
+
+    return float(beta)
 
 
 def calculate_rolling_volatility(
@@ -250,29 +369,48 @@ def calculate_rolling_volatility(
     if weights.empty:
         raise ValueError("Weights Series is empty")
 
+    returns_filled = returns.ffill().fillna(0)
+    aligned_returns = returns_filled[weights.index]
+
+    portfolio_returns = aligned_returns.to_numpy() @ weights.to_numpy()
+
+    return calculate_volatility_from_returns(portfolio_returns, window=window)
+
+
+def calculate_volatility_from_returns(
+    portfolio_returns: np.ndarray, window: int = 20
+) -> Optional[float]:
+    """
+    Calculate annualized volatility over the latest window of precomputed portfolio returns.
+
+    Args:
+        portfolio_returns: 1-D array of daily portfolio returns, oldest first, without NaN
+        window: Rolling window size in days (default 20)
+
+    Returns:
+        Annualized rolling volatility as decimal (e.g., 0.18 for 18%), or None if insufficient data
+
+    Raises:
+        ValueError: If window is smaller than 2
+    """
     if window < 2:
         raise ValueError(f"Window must be at least 2 days, got {window}")
 
-    if len(returns) < window:
+    if len(portfolio_returns) < window:
         logger.warning(
-            f"Insufficient data for volatility calculation: {len(returns)} days < {window} window"
+            f"Insufficient data for volatility calculation: {len(portfolio_returns)} days < {window} window"
         )
         return None
 
-    returns_filled = returns.ffill().fillna(0)
-    aligned_returns = returns_filled[weights.index]
-
-    portfolio_returns = aligned_returns @ weights.values
-
-    rolling_std = portfolio_returns.rolling(window=window).std()
-    latest_std = rolling_std.iloc[-1]
+    tail = portfolio_returns[-window:]
+    latest_std = 0.0 if np.ptp(tail) == 0 else tail.std(ddof=1)
 
-    if pd.isna(latest_std):
+    if np.isnan(latest_std):
         logger.warning("Rolling std contains NaN - insufficient data")
         return None
 
     annualized_vol = latest_std * np.sqrt(252)
 
-    logger.info(f"Rolling volatility calculated: {annualized_vol:.6f} (window={window}d)")
+    logger.info("Rolling volatility calculated: %.6f (window=%sd)", annualized_vol, window)
 
     return float(annualized_vol)
@@ -2,14 +2,32 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Optional
+from collections import OrderedDict
+from typing import Literal, Optional, Sequence, Tuple, Union
 
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Sorted, read-only simulated returns of seeded runs keyed by a digest of the per-date
+# portfolio returns and the simulation settings (see _simulation_key); lets VaR and ES (or
+# several confidence levels) computed separately with one seed share a single simulation
+_SIMULATION_CACHE_SIZE = 8
+_simulation_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+# Paths simulated per chunk when streaming; one float64 chunk is 512 KB and stays in L2
+STREAM_CHUNK_SIZE = 65_536
+
+# Annualisation factor for daily volatility (252 trading days)
+SQRT_252 = float(np.sqrt(252))
+
+SamplingMethod = Literal["bootstrap", "stratified", "antithetic"]
+SimulationMethod = Literal["historical", "parametric"]
+
 
 def validate_portfolio_inputs(
     returns: pd.DataFrame, weights: pd.Series, tolerance: float = 1e-4
@@ -44,41 +62,334 @@ def validate_portfolio_inputs(
     if (weights < 0).any():
         raise ValueError("Negative weights detected - long-only portfolios required")
 
-    if returns.isna().any().any():
+    if np.isnan(returns.to_numpy(dtype=np.float64)).any():
         logger.warning("Returns contain NaN values - will forward fill missing data")
 
 
-def calculate_portfolio_var(
+def _ffill_inplace(matrix: np.ndarray) -> None:
+    """
+    Forward-fill NaN down each column of a 2-D array in place, then zero leading NaN.
+
+    Equivalent to DataFrame.ffill().fillna(0) without building intermediate frames.
+
+    Args:
+        matrix: 2-D float array (rows=dates, cols=tickers)
+    """
+    missing = np.isnan(matrix)
+    if not missing.any():
+        return
+
+    # Row index of the last observed value at or above each cell
+    rows = np.where(missing, 0, np.arange(len(matrix))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    matrix[...] = np.take_along_axis(matrix, rows, axis=0)
+    matrix[np.isnan(matrix)] = 0
+
+
+def _prepare_matrix(
+    returns: pd.DataFrame,
+    weights: Union[pd.Series, pd.DataFrame],
+    dtype: npt.DTypeLike = np.float64,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the forward-filled returns matrix aligned to the weights as raw NumPy arrays.
+
+    Nothing is memoised here; callers that run several calculations over one portfolio
+    should use VaRCalculator, which prepares the matrix once.
+
+    Args:
+        returns: DataFrame of historical returns (rows=dates, cols=tickers)
+        weights: Series of portfolio weights indexed by ticker, or a DataFrame with one
+            column of weights per portfolio
+        dtype: Floating-point type of the returned arrays (default float64)
+
+    Returns:
+        Tuple of (C-contiguous returns matrix, weight vector or matrix)
+    """
+    # np.take along the columns yields a fresh C-contiguous copy that is safe to fill, and
+    # selecting before the cast converts only the weighted columns
+    matrix = np.take(
+        returns.to_numpy(dtype=np.float64), returns.columns.get_indexer(weights.index), axis=1
+    ).astype(dtype, copy=False)
+    _ffill_inplace(matrix)
+    return matrix, weights.to_numpy(dtype=dtype)
+
+
+def _stratified_indices(
+    n_periods: int, n_simulations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Draw date indices so that every date is used floor or ceil(n_simulations / n_periods) times.
+
+    Args:
+        n_periods: Number of historical dates to sample from
+        n_simulations: Number of indices to draw
+        rng: Random generator used for the shuffle and the leftover dates
+
+    Returns:
+        1-D array of n_simulations date indices in random order
+    """
+    full_passes, remainder = divmod(n_simulations, n_periods)
+    indices = np.concatenate(
+        (
+            np.tile(np.arange(n_periods), full_passes),
+            rng.choice(n_periods, size=remainder, replace=False),
+        )
+    )
+    rng.shuffle(indices)
+    return indices
+
+
+def _simulate_portfolio_returns(
+    per_date_returns: np.ndarray,
+    n_simulations: int,
+    random_seed: Optional[int] = None,
+    sampling: SamplingMethod = "bootstrap",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Simulate portfolio returns by resampling historical dates.
+
+    "bootstrap" draws dates uniformly with replacement. "stratified" uses every date an
+    equal number of times (up to one) and shuffles them, which removes the sampling noise
+    in how often each date appears. "antithetic" bootstraps half the paths and pairs each
+    with the date of mirrored rank in the portfolio return distribution, so the sample is
+    balanced between good and bad days.
+
+    Args:
+        per_date_returns: 1-D array of historical portfolio returns, one per date
+        n_simulations: Number of Monte Carlo simulation paths
+        random_seed: Random seed for reproducibility (optional)
+        sampling: Date sampling scheme (default "bootstrap")
+        out: Optional buffer of length n_simulations and the same dtype as
+            per_date_returns to write the paths into
+
+    Returns:
+        1-D array of simulated portfolio returns (out, when given)
+
+    Raises:
+        ValueError: If the sampling scheme is unknown
+    """
+    n_periods = len(per_date_returns)
+    rng = np.random.default_rng(random_seed)
+
+    if sampling == "bootstrap":
+        simulated_indices = rng.integers(0, n_periods, size=n_simulations)
+    elif sampling == "stratified":
+        simulated_indices = _stratified_indices(n_periods, n_simulations, rng)
+    elif sampling == "antithetic":
+        ranks = rng.integers(0, n_periods, size=(n_simulations + 1) // 2)
+        by_rank = np.argsort(per_date_returns, kind="stable")
+        simulated_indices = by_rank[
+            np.concatenate((ranks, n_periods - 1 - ranks))[:n_simulations]
+        ]
+    else:
+        raise ValueError(f"Unknown sampling method '{sampling}'")
+
+    return np.take(per_date_returns, simulated_indices, out=out)
+
+
+def _simulate_parametric_returns(
+    per_date_returns: np.ndarray, n_simulations: int, random_seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Simulate portfolio returns from a normal fit to the historical portfolio returns.
+
+    With multivariate normal asset returns the portfolio return is normal with mean w'mu
+    and variance w'Σw, which equal the mean and variance of the per-date portfolio
+    returns. One univariate draw per path therefore replaces the Cholesky factor and the
+    (n_simulations, n_assets) correlated draw.
+
+    Args:
+        per_date_returns: 1-D array of historical portfolio returns, one per date
+        n_simulations: Number of Monte Carlo simulation paths
+        random_seed: Random seed for reproducibility (optional)
+
+    Returns:
+        1-D array of simulated portfolio returns
+    """
+    mean = per_date_returns.mean()
+    std = per_date_returns.std(ddof=1)
+
+    rng = np.random.default_rng(random_seed)
+    simulated_returns = rng.standard_normal(n_simulations, dtype=per_date_returns.dtype)
+    simulated_returns *= std
+    simulated_returns += mean
+    return simulated_returns
+
+
+def _simulation_key(
+    per_date_returns: np.ndarray,
+    n_simulations: int,
+    random_seed: int,
+    sampling: SamplingMethod,
+    method: SimulationMethod,
+) -> tuple:
+    """
+    Return the seeded-simulation cache key for one set of per-date portfolio returns.
+
+    A seeded simulation depends only on these inputs, so hashing the 1-D per-date returns
+    (one value per date) identifies it by content without touching the full returns frame.
+
+    Args:
+        per_date_returns: 1-D array of historical portfolio returns, one per date
+        n_simulations: Number of Monte Carlo simulation paths
+        random_seed: Random seed of the run
+        sampling: Date sampling scheme
+        method: "historical" or "parametric" simulation
+
+    Returns:
+        Hashable tuple identifying the simulated paths
+    """
+    return (
+        per_date_returns.dtype.str,
+        hashlib.blake2b(np.ascontiguousarray(per_date_returns), digest_size=16).digest(),
+        n_simulations,
+        random_seed,
+        sampling,
+        method,
+    )
+
+
+def _tail_size(confidence_level: float, n_simulations: int) -> int:
+    """Return the number of tail scenarios k (at least one) behind VaR and ES."""
+    return max(1, round((1 - confidence_level) * n_simulations))
+
+
+def _var_and_es_from_simulation(
+    portfolio_returns: np.ndarray, confidence_level: float, is_sorted: bool = False
+) -> Tuple[float, float]:
+    """
+    Read VaR and Expected Shortfall off simulated portfolio returns.
+
+    With k = max(1, round((1 - confidence_level) * n)), VaR is the k-th worst scenario
+    and ES is the mean of the k worst scenarios. Unsorted arrays are partitioned in place.
+
+    Args:
+        portfolio_returns: 1-D array of simulated portfolio returns
+        confidence_level: VaR/ES confidence level
+        is_sorted: Whether portfolio_returns is already sorted ascending
+
+    Returns:
+        Tuple of (VaR, Expected Shortfall) as negative percentages
+    """
+    n_simulations = len(portfolio_returns)
+
+    # O(n) selection: the k-th worst lands at index k - 1 with the rest of the tail before it
+    k = _tail_size(confidence_level, n_simulations)
+    if not is_sorted:
+        portfolio_returns.partition(k - 1)
+    var = portfolio_returns[k - 1]
+    expected_shortfall = portfolio_returns[:k].mean()
+
+    logger.info(
+        "VaR/ES calculated: %.6f/%.6f (%d simulations, %.0f%% confidence)",
+        var, expected_shortfall, n_simulations, confidence_level * 100
+    )
+
+    return float(var), float(expected_shortfall)
+
+
+def _streamed_var_and_es(
+    per_date_returns: np.ndarray,
+    n_simulations: int,
+    confidence_level: float,
+    random_seed: Optional[int] = None,
+    method: SimulationMethod = "historical",
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Tuple[float, float]:
+    """
+    Simulate in chunks and keep only the k worst paths, for very large n_simulations.
+
+    Memory is O(k + chunk_size) instead of O(n_simulations). The generator is consumed
+    in the same order as a single draw, so results match the unchunked bootstrap or
+    parametric simulation for the same seed.
+
+    Args:
+        per_date_returns: 1-D array of historical portfolio returns, one per date
+        n_simulations: Number of Monte Carlo simulation paths
+        confidence_level: VaR/ES confidence level
+        random_seed: Random seed for reproducibility (optional)
+        method: "historical" bootstrap or "parametric" normal draws
+        chunk_size: Paths simulated per chunk (default STREAM_CHUNK_SIZE)
+
+    Returns:
+        Tuple of (VaR, Expected Shortfall) as negative percentages
+    """
+    n_periods = len(per_date_returns)
+    k = _tail_size(confidence_level, n_simulations)
+    rng = np.random.default_rng(random_seed)
+
+    if method == "parametric":
+        mean = per_date_returns.mean()
+        std = per_date_returns.std(ddof=1)
+
+    tail = per_date_returns[:0]
+    for start in range(0, n_simulations, chunk_size):
+        size = min(chunk_size, n_simulations - start)
+        if method == "parametric":
+            chunk = rng.standard_normal(size, dtype=per_date_returns.dtype)
+            chunk *= std
+            chunk += mean
+        else:
+            chunk = per_date_returns[rng.integers(0, n_periods, size=size)]
+
+        candidates = np.concatenate((tail, chunk))
+        if len(candidates) > k:
+            candidates.partition(k - 1)
+            candidates = candidates[:k]
+        tail = candidates
+
+    var = tail.max()
+    expected_shortfall = tail.mean()
+
+    logger.info(
+        "VaR/ES calculated: %.6f/%.6f (%d simulations in chunks of %d, %.0f%% confidence)",
+        var, expected_shortfall, n_simulations, chunk_size, confidence_level * 100
+    )
+
+    return float(var), float(expected_shortfall)
+
+
+def calculate_var_and_es(
     returns: pd.DataFrame,
     weights: pd.Series,
     confidence_level: float = 0.95,
     n_simulations: int = 1000,
     random_seed: Optional[int] = None,
-) -> float:
+    sampling: SamplingMethod = "bootstrap",
+    dtype: npt.DTypeLike = np.float32,
+    method: SimulationMethod = "historical",
+    chunk_size: Optional[int] = None,
+) -> Tuple[float, float]:
     """
-    Calculate portfolio Value-at-Risk using Monte Carlo simulation with historical sampling.
+    Calculate portfolio VaR and Expected Shortfall from a single Monte Carlo simulation.
 
-    VaR represents the maximum expected loss at a given confidence level. A 95% VaR of -2.31%
-    means there is a 5% chance of losing more than 2.31% in a single period.
+    Both measures come from one partition of the simulated portfolio returns: with
+    k = max(1, round((1 - confidence_level) * n_simulations)), VaR is the k-th worst
+    scenario and ES is the mean of the k worst scenarios. Seeded runs are kept per
+    portfolio returns, so VaR and ES requested separately with the same seed (or several
+    confidence levels) share one simulation.
 
     Args:
         returns: DataFrame of historical returns (rows=dates, cols=tickers)
         weights: Series of portfolio weights indexed by ticker
-        confidence_level: VaR confidence level (default 0.95 for 95% VaR)
+        confidence_level: VaR/ES confidence level (default 0.95)
         n_simulations: Number of Monte Carlo simulation paths (default 1000)
         random_seed: Random seed for reproducibility (optional)
+        sampling: "bootstrap" (default), "stratified" or "antithetic" date sampling
+        dtype: Floating-point type of the simulation (default float32; pass np.float64
+            for full precision)
+        method: "historical" (default) resamples observed dates; "parametric" draws from
+            a normal fit to the portfolio returns (sampling does not apply)
+        chunk_size: If set, simulate this many paths at a time and keep only the tail,
+            bounding memory for very large n_simulations (bootstrap sampling only)
 
     Returns:
-        VaR as negative percentage (e.g., -0.0231 for -2.31% loss at 95% confidence)
+        Tuple of (VaR, Expected Shortfall) as negative percentages
 
     Raises:
-        ValueError: If inputs fail validation
-
-    Example:
-        >>> returns = pd.DataFrame({'AAPL': [0.01, -0.02, 0.015], 'MSFT': [0.005, -0.01, 0.02]})
-        >>> weights = pd.Series({'AAPL': 0.6, 'MSFT': 0.4})
-        >>> var = calculate_portfolio_var(returns, weights, confidence_level=0.95)
-        >>> print(f"95% VaR: {var:.4f}")
+        ValueError: If inputs fail validation or the method is unknown
     """
     validate_portfolio_inputs(returns, weights)
 
@@ -88,31 +399,254 @@ def calculate_portfolio_var(
     if n_simulations < 100:
         raise ValueError(f"Minimum 100 simulations required, got {n_simulations}")
 
-    returns_filled = returns.ffill().fillna(0)
-    aligned_returns = returns_filled[weights.index]
+    if method not in ("historical", "parametric"):
+        raise ValueError(f"Unknown simulation method '{method}'")
 
-    rng = np.random.default_rng(random_seed)
+    if chunk_size is not None and method == "historical" and sampling != "bootstrap":
+        raise ValueError(f"Chunked simulation does not support '{sampling}' sampling")
 
     try:
-        n_periods = len(aligned_returns)
-        simulated_indices = rng.integers(0, n_periods, size=n_simulations)
-        simulated_returns = aligned_returns.values[simulated_indices]
+        matrix, weight_vector = _prepare_matrix(returns, weights, dtype)
+
+        # Weighting is linear, so sampling dates from the per-date portfolio returns is
+        # equivalent to sampling rows of the matrix and multiplying each by the weights
+        per_date_returns = matrix @ weight_vector
+
+        cache_key = None
+        if random_seed is not None and chunk_size is None:
+            cache_key = _simulation_key(
+                per_date_returns, n_simulations, random_seed, sampling, method
+            )
+            cached_returns = _simulation_cache.get(cache_key)
+            if cached_returns is not None:
+                _simulation_cache.move_to_end(cache_key)
+                return _var_and_es_from_simulation(
+                    cached_returns, confidence_level, is_sorted=True
+                )
+
+        if chunk_size is not None:
+            return _streamed_var_and_es(
+                per_date_returns,
+                n_simulations,
+                confidence_level,
+                random_seed,
+                method,
+                chunk_size,
+            )
+
+        if method == "parametric":
+            portfolio_returns = _simulate_parametric_returns(
+                per_date_returns, n_simulations, random_seed
+            )
+        else:
+            portfolio_returns = _simulate_portfolio_returns(
+                per_date_returns, n_simulations, random_seed, sampling
+            )
+
+        if cache_key is not None:
+            # Seeded runs are reproducible, so sort once and keep them for later calls
+            portfolio_returns.sort()
+            portfolio_returns.flags.writeable = False
+            _simulation_cache[cache_key] = portfolio_returns
+            if len(_simulation_cache) > _SIMULATION_CACHE_SIZE:
+                _simulation_cache.popitem(last=False)
+            return _var_and_es_from_simulation(portfolio_returns, confidence_level, is_sorted=True)
+
+        return _var_and_es_from_simulation(portfolio_returns, confidence_level)
+
+    except Exception as e:
+        logger.error(f"VaR/ES calculation failed: {e}", exc_info=True)
+        raise
+
 
-        portfolio_returns = simulated_returns @ weights.values
+class VaRCalculator:
+    """Monte Carlo VaR/ES and volatility for a fixed portfolio, reused across repeated calls.
 
-        percentile_rank = (1 - confidence_level) * 100
-        var = np.percentile(portfolio_returns, percentile_rank)
+    Validation, the ffill/alignment and the per-date weighting are done once at
+    construction; VaR, ES and volatility all read the same 1-D per-date portfolio
+    returns, and every simulation writes its paths into the same buffer.
+    Each call still seeds a fresh generator, so results match calculate_var_and_es
+    for the same seed.
+    """
 
-        logger.info(
-            f"VaR calculated: {var:.6f} "
-            f"({n_simulations} simulations, {confidence_level:.0%} confidence)"
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        weights: pd.Series,
+        n_simulations: int = 1000,
+        sampling: SamplingMethod = "bootstrap",
+        dtype: npt.DTypeLike = np.float32,
+    ):
+        """
+        Prepare the portfolio for repeated VaR/ES calculations.
+
+        Args:
+            returns: DataFrame of historical returns (rows=dates, cols=tickers)
+            weights: Series of portfolio weights indexed by ticker
+            n_simulations: Number of Monte Carlo simulation paths (default 1000)
+            sampling: "bootstrap" (default), "stratified" or "antithetic" date sampling
+            dtype: Floating-point type of the simulation (default float32)
+
+        Raises:
+            ValueError: If inputs fail validation
+        """
+        validate_portfolio_inputs(returns, weights)
+
+        if n_simulations < 100:
+            raise ValueError(f"Minimum 100 simulations required, got {n_simulations}")
+
+        matrix, weight_vector = _prepare_matrix(returns, weights, dtype)
+        self.per_date_returns = matrix @ weight_vector
+        self.n_simulations = n_simulations
+        self.sampling = sampling
+        self._pnl = np.empty(n_simulations, dtype=self.per_date_returns.dtype)
+
+    def var_and_es(
+        self, confidence_level: float = 0.95, random_seed: Optional[int] = None
+    ) -> Tuple[float, float]:
+        """
+        Calculate VaR and Expected Shortfall for the bound portfolio.
+
+        Args:
+            confidence_level: VaR/ES confidence level (default 0.95)
+            random_seed: Random seed for reproducibility (optional)
+
+        Returns:
+            Tuple of (VaR, Expected Shortfall) as negative percentages
+
+        Raises:
+            ValueError: If the confidence level is invalid
+        """
+        if not 0 < confidence_level < 1:
+            raise ValueError(f"Confidence level must be between 0 and 1, got {confidence_level}")
+
+        portfolio_returns = _simulate_portfolio_returns(
+            self.per_date_returns, self.n_simulations, random_seed, self.sampling, out=self._pnl
         )
+        return _var_and_es_from_simulation(portfolio_returns, confidence_level)
 
-        return float(var)
+    def volatility(self) -> float:
+        """
+        Calculate annualized volatility of the bound portfolio.
 
-    except Exception as e:
-        logger.error(f"VaR calculation failed: {e}", exc_info=True)
-        raise
+        Returns:
+            Annualized portfolio volatility as decimal (e.g., 0.18 for 18% annualized vol)
+        """
+        daily_vol = self.per_date_returns.std(ddof=1, dtype=np.float64)
+        return float(daily_vol * SQRT_252)
+
+
+def calculate_portfolio_var_batch(
+    returns: pd.DataFrame,
+    weights_matrix: pd.DataFrame,
+    confidence_levels: Sequence[float] = (0.95,),
+    n_simulations: int = 1000,
+    random_seed: Optional[int] = None,
+    dtype: npt.DTypeLike = np.float32,
+) -> pd.DataFrame:
+    """
+    Calculate Monte Carlo VaR and Expected Shortfall for many portfolios in one pass.
+
+    All portfolios share one set of bootstrap draws: a single matrix product gives every
+    portfolio's per-date return, one gather builds the (n_simulations, K) paths and one
+    multi-kth partition serves every confidence level. A column matches
+    calculate_var_and_es for the same seed up to floating-point rounding.
+
+    Args:
+        returns: DataFrame of historical returns (rows=dates, cols=tickers)
+        weights_matrix: DataFrame of weights (rows=tickers, cols=portfolio IDs)
+        confidence_levels: VaR/ES confidence levels (default 95% only)
+        n_simulations: Number of Monte Carlo simulation paths (default 1000)
+        random_seed: Random seed for reproducibility (optional)
+        dtype: Floating-point type of the simulation (default float32)
+
+    Returns:
+        DataFrame indexed by portfolio ID with VaR_<level> and ES_<level> columns
+        (e.g. VaR_95, ES_95) as negative percentages
+
+    Raises:
+        ValueError: If inputs fail validation
+    """
+    for portfolio_id in weights_matrix.columns:
+        validate_portfolio_inputs(returns, weights_matrix[portfolio_id])
+
+    for confidence_level in confidence_levels:
+        if not 0 < confidence_level < 1:
+            raise ValueError(
+                f"Confidence level must be between 0 and 1, got {confidence_level}"
+            )
+
+    if n_simulations < 100:
+        raise ValueError(f"Minimum 100 simulations required, got {n_simulations}")
+
+    matrix, weight_matrix = _prepare_matrix(returns, weights_matrix, dtype)
+    per_date_returns = matrix @ weight_matrix
+
+    rng = np.random.default_rng(random_seed)
+    simulated_indices = rng.integers(0, len(per_date_returns), size=n_simulations)
+    portfolio_returns = per_date_returns[simulated_indices]
+
+    tail_sizes = [_tail_size(level, n_simulations) for level in confidence_levels]
+    portfolio_returns.partition(sorted({k - 1 for k in tail_sizes}), axis=0)
+
+    results = {}
+    for confidence_level, k in zip(confidence_levels, tail_sizes):
+        label = f"{confidence_level * 100:g}"
+        results[f"VaR_{label}"] = portfolio_returns[k - 1]
+        results[f"ES_{label}"] = portfolio_returns[:k].mean(axis=0)
+
+    logger.info(
+        "Batch VaR/ES calculated for %d portfolios (%d simulations, %d confidence levels)",
+        weights_matrix.shape[1], n_simulations, len(tail_sizes)
+    )
+
+    return pd.DataFrame(results, index=weights_matrix.columns)
+
+
+def calculate_portfolio_var(
+    returns: pd.DataFrame,
+    weights: pd.Series,
+    confidence_level: float = 0.95,
+    n_simulations: int = 1000,
+    random_seed: Optional[int] = None,
+    sampling: SamplingMethod = "bootstrap",
+    dtype: npt.DTypeLike = np.float32,
+    method: SimulationMethod = "historical",
+) -> float:
+    """
+    Calculate portfolio Value-at-Risk using Monte Carlo simulation with historical sampling.
+
+    VaR represents the maximum expected loss at a given confidence level. A 95% VaR of -2.31%
+    means there is a 5% chance of losing more than 2.31% in a single period.
+
+    Args:
+        returns: DataFrame of historical returns (rows=dates, cols=tickers)
+        weights: Series of portfolio weights indexed by ticker
+        confidence_level: VaR confidence level (default 0.95 for 95% VaR)
+        n_simulations: Number of Monte Carlo simulation paths (default 1000)
+        random_seed: Random seed for reproducibility (optional)
+        sampling: "bootstrap" (default), "stratified" or "antithetic" date sampling
+        dtype: Floating-point type of the simulation (default float32; pass np.float64
+            for full precision)
+        method: "historical" (default) resamples observed dates; "parametric" draws from
+            a normal fit to the portfolio returns (sampling does not apply)
+
+    Returns:
+        VaR as negative percentage (e.g., -0.0231 for -2.31% loss at 95% confidence)
+
+    Raises:
+        ValueError: If inputs fail validation
+
+    Example:
+        >>> returns = pd.DataFrame({'AAPL': [0.01, -0.02, 0.015], 'MSFT': [0.005, -0.01, 0.02]})
+        >>> weights = pd.Series({'AAPL': 0.6, 'MSFT': 0.4})
+        >>> var = calculate_portfolio_var(returns, weights, confidence_level=0.95)
+        >>> print(f"95% VaR: {var:.4f}")
+    """
+    var, _ = calculate_var_and_es(
+        returns, weights, confidence_level, n_simulations, random_seed, sampling, dtype, method
+    )
+    return var
 
 
 def calculate_expected_shortfall(
@@ -121,6 +655,9 @@ def calculate_expected_shortfall(
     confidence_level: float = 0.95,
     n_simulations: int = 1000,
     random_seed: Optional[int] = None,
+    sampling: SamplingMethod = "bootstrap",
+    dtype: npt.DTypeLike = np.float32,
+    method: SimulationMethod = "historical",
 ) -> float:
     """
     Calculate Expected Shortfall (Conditional VaR) using Monte Carlo simulation.
@@ -134,6 +671,11 @@ def calculate_expected_shortfall(
         confidence_level: ES confidence level (default 0.95 for 95% ES)
         n_simulations: Number of Monte Carlo simulation paths (default 1000)
         random_seed: Random seed for reproducibility (optional)
+        sampling: "bootstrap" (default), "stratified" or "antithetic" date sampling
+        dtype: Floating-point type of the simulation (default float32; pass np.float64
+            for full precision)
+        method: "historical" (default) resamples observed dates; "parametric" draws from
+            a normal fit to the portfolio returns (sampling does not apply)
 
     Returns:
         Expected Shortfall as negative percentage (e.g., -0.0312 for -3.12% average loss
@@ -148,47 +690,48 @@ def calculate_expected_shortfall(
         >>> es = calculate_expected_shortfall(returns, weights, confidence_level=0.95)
         >>> print(f"95% ES: {es:.4f}")
     """
-    validate_portfolio_inputs(returns, weights)
+    _, expected_shortfall = calculate_var_and_es(
+        returns, weights, confidence_level, n_simulations, random_seed, sampling, dtype, method
+    )
+    return expected_shortfall
 
-    if not 0 < confidence_level < 1:
-        raise ValueError(f"Confidence level must be between 0 and 1, got {confidence_level}")
 
-    if n_simulations < 100:
-        raise ValueError(f"Minimum 100 simulations required, got {n_simulations}")
-
-    returns_filled = returns.ffill().fillna(0)
-    aligned_returns = returns_filled[weights.index]
+def calculate_historical_var_and_es(
+    portfolio_returns: np.ndarray, confidence_level: float = 0.95
+) -> Tuple[float, float]:
+    """
+    Calculate VaR and Expected Shortfall by historical simulation.
 
-    rng = np.random.default_rng(random_seed)
+    Uses the empirical distribution of the observed portfolio returns directly,
+    which is the value the bootstrap Monte Carlo estimates converge to, at the
+    cost of a single percentile instead of n_simulations resampled rows.
 
-    try:
-        n_periods = len(aligned_returns)
-        simulated_indices = rng.integers(0, n_periods, size=n_simulations)
-        simulated_returns = aligned_returns.values[simulated_indices]
-
-        portfolio_returns = simulated_returns @ weights.values
+    Args:
+        portfolio_returns: 1-D array of daily portfolio returns without NaN
+        confidence_level: VaR/ES confidence level (default 0.95)
 
-        percentile_rank = (1 - confidence_level) * 100
-        var_threshold = np.percentile(portfolio_returns, percentile_rank)
+    Returns:
+        Tuple of (VaR, Expected Shortfall) as negative percentages
 
-        worst_scenarios = portfolio_returns[portfolio_returns <= var_threshold]
+    Raises:
+        ValueError: If inputs fail validation
+    """
+    if len(portfolio_returns) == 0:
+        raise ValueError("Portfolio returns are empty")
 
-        if len(worst_scenarios) == 0:
-            logger.warning("No scenarios exceeded VaR threshold - returning VaR as ES")
-            expected_shortfall = var_threshold
-        else:
-            expected_shortfall = np.mean(worst_scenarios)
+    if not 0 < confidence_level < 1:
+        raise ValueError(f"Confidence level must be between 0 and 1, got {confidence_level}")
 
-        logger.info(
-            f"Expected Shortfall calculated: {expected_shortfall:.6f} "
-            f"(average of {len(worst_scenarios)} worst scenarios out of {n_simulations})"
-        )
+    var = np.percentile(portfolio_returns, (1 - confidence_level) * 100)
+    worst_scenarios = portfolio_returns[portfolio_returns <= var]
+    expected_shortfall = worst_scenarios.mean() if len(worst_scenarios) else var
 
-        return float(expected_shortfall)
+    logger.info(
+        "Historical VaR/ES calculated: %.6f/%.6f (%d observations, %.0f%% confidence)",
+        var, expected_shortfall, len(portfolio_returns), confidence_level * 100
+    )
 
-    except Exception as e:
-        logger.error(f"Expected Shortfall calculation failed: {e}", exc_info=True)
-        raise
+    return float(var), float(expected_shortfall)
 
 
 def calculate_portfolio_volatility(returns: pd.DataFrame, weights: pd.Series) -> float:
@@ -207,14 +750,13 @@ def calculate_portfolio_volatility(returns: pd.DataFrame, weights: pd.Series) ->
     """
     validate_portfolio_inputs(returns, weights)
 
-    returns_filled = returns.ffill().fillna(0)
-    aligned_returns = returns_filled[weights.index]
+    matrix, weight_vector = _prepare_matrix(returns, weights)
 
-    portfolio_returns = aligned_returns @ weights.values
+    portfolio_returns = matrix @ weight_vector
 
-    daily_vol = portfolio_returns.std()
-    annualized_vol = daily_vol * np.sqrt(252)
+    daily_vol = portfolio_returns.std(ddof=1)
+    annualized_vol = daily_vol * SQRT_252
 
-    logger.info(f"Portfolio volatility: {annualized_vol:.6f} (annualized)")
+    logger.info("Portfolio volatility: %.6f (annualized)", annualized_vol)
 
     return float(annualized_vol)
@@ -0,0 +1,49 @@
+"""Unit tests for dashboard alert evaluation."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dashboard.alerts import evaluate_all_alerts, evaluate_all_alerts_batch
+
+
+class TestEvaluateAllAlertsBatch:
+    """Tests for the vectorized alert replay over a metrics history."""
+
+    def test_matches_row_by_row(self):
+        """Test each row's batch alerts equal evaluate_all_alerts on that row's replay."""
+        # Sharpe negative for 10 rows (persistent), then 9, 8, 7 of 10 (declining), then 6
+        history = pd.DataFrame(
+            {
+                "VaR": [-0.03, -0.018, -0.01, np.nan] * 3 + [-0.025, -0.005],
+                "Beta": [1.6, 1.4, 1.0, np.nan, 1.2, 1.7, 1.35] * 2,
+                "Volatility": [0.35, 0.1] * 7,
+                "Sharpe": [-0.5] * 10 + [0.3] * 4,
+            },
+            index=pd.date_range("2025-01-01", periods=14, freq="D"),
+        )
+
+        batch = evaluate_all_alerts_batch(history)
+
+        assert {
+            "VaR Critical", "VaR Elevated", "High Beta", "Elevated Beta", "High Volatility",
+            "Persistent Negative Sharpe", "Declining Sharpe",
+        } <= set(batch["type"])
+        for position, (date, row) in enumerate(history.iterrows()):
+            latest = {
+                "var": {"value": row["VaR"]},
+                "beta": {"value": row["Beta"]},
+                "volatility": {"value": row["Volatility"]},
+            }
+            expected = [
+                (alert.severity, alert.type, alert.message)
+                for alert in evaluate_all_alerts(latest, history.iloc[: position + 1])
+            ]
+            actual = list(batch.loc[batch.index == date].itertuples(index=False, name=None))
+            assert actual == expected, f"Mismatch at row {position}"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -9,45 +9,67 @@ import pytest
 from src.risk_engine.performance_metrics import (
     calculate_beta,
     calculate_beta_from_dataframes,
+    calculate_beta_from_returns,
     calculate_rolling_volatility,
     calculate_sharpe_ratio,
+    calculate_sharpe_ratio_from_returns,
+    calculate_volatility_from_returns,
 )
 from src.risk_engine.var_calculator import (
+    VaRCalculator,
     calculate_expected_shortfall,
+    calculate_historical_var_and_es,
     calculate_portfolio_var,
+    calculate_portfolio_var_batch,
     calculate_portfolio_volatility,
+    calculate_var_and_es,
     validate_portfolio_inputs,
 )
 
+# Shared date indexes; tests only need them for alignment, so build each once
+_DATES_100 = pd.date_range("2025-01-01", periods=100, freq="D")
+_DATES_50 = _DATES_100[:50]
+_DATES_10 = _DATES_100[:10]
 
-@pytest.fixture
+_EQUAL_WEIGHTS = pd.Series({"AAPL": 1 / 3, "MSFT": 1 / 3, "GOOGL": 1 / 3}, dtype=np.float64)
+
+
+@pytest.fixture(scope="module")
 def simple_returns():
-    """Create deterministic returns for testing."""
-    dates = pd.date_range("2025-01-01", periods=100, freq="D")
-    returns = pd.DataFrame(
-        {
-            "AAPL": np.random.RandomState(42).normal(0.001, 0.02, 100),
-            "MSFT": np.random.RandomState(43).normal(0.0008, 0.018, 100),
-            "GOOGL": np.random.RandomState(44).normal(0.0012, 0.022, 100),
-        },
-        index=dates,
+    """Create deterministic returns for testing (shared read-only across the module)."""
+    returns = np.random.default_rng(42).normal(
+        loc=[0.001, 0.0008, 0.0012], scale=[0.02, 0.018, 0.022], size=(100, 3)
     )
-    return returns
+    return pd.DataFrame(returns, index=_DATES_100, columns=["AAPL", "MSFT", "GOOGL"])
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def equal_weights():
     """Create equal weights for 3 assets."""
-    return pd.Series({"AAPL": 1 / 3, "MSFT": 1 / 3, "GOOGL": 1 / 3})
+    return _EQUAL_WEIGHTS
+
+
+@pytest.fixture(scope="module")
+def portfolio_returns(simple_returns, equal_weights):
+    """Create equal-weight portfolio returns from the simple returns fixture."""
+    return pd.Series(
+        simple_returns.to_numpy() @ equal_weights.to_numpy(), index=simple_returns.index
+    )
+
+
+@pytest.fixture(scope="module")
+def short_returns():
+    """Create 10 days of returns, shorter than the 20-day metric window."""
+    returns = np.random.default_rng(10).standard_normal((10, 3))
+    return pd.DataFrame(returns, index=_DATES_10, columns=["AAPL", "MSFT", "GOOGL"])
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def benchmark_returns():
     """Create benchmark returns for beta testing."""
-    dates = pd.date_range("2025-01-01", periods=100, freq="D")
     return pd.Series(
-        np.random.RandomState(50).normal(0.0005, 0.015, 100),
-        index=dates,
+        np.random.default_rng(50).standard_normal(100) * 0.015 + 0.0005,
+        index=_DATES_100,
         name="SPY",
     )
 
@@ -59,6 +81,14 @@ class TestValidatePortfolioInputs:
         """Test that valid inputs pass validation."""
         validate_portfolio_inputs(simple_returns, equal_weights)
 
+    def test_revalidates_after_in_place_relabel(self, simple_returns, equal_weights):
+        """Test a validated frame whose columns are renamed in place is validated again."""
+        returns = simple_returns.copy()
+        validate_portfolio_inputs(returns, equal_weights)
+        returns.columns = ["X", "Y", "Z"]
+        with pytest.raises(ValueError, match="Weights contain tickers not in returns"):
+            validate_portfolio_inputs(returns, equal_weights)
+
     def test_empty_returns(self, equal_weights):
         """Test that empty returns raise ValueError."""
         with pytest.raises(ValueError, match="Returns DataFrame is empty"):
@@ -94,20 +124,19 @@ class TestCalculatePortfolioVar:
     def test_var_basic_calculation(self, simple_returns, equal_weights):
         """Test basic VaR calculation returns negative value."""
         var = calculate_portfolio_var(
-            simple_returns, equal_weights, confidence_level=0.95, n_simulations=1000
+            simple_returns, equal_weights, confidence_level=0.95, n_simulations=100
         )
         assert isinstance(var, float)
         assert var < 0, "VaR should be negative (representing a loss)"
 
-    def test_var_deterministic_seed(self, simple_returns, equal_weights):
-        """Test that random seed produces reproducible results."""
-        var1 = calculate_portfolio_var(
-            simple_returns, equal_weights, confidence_level=0.95, random_seed=42
-        )
-        var2 = calculate_portfolio_var(
-            simple_returns, equal_weights, confidence_level=0.95, random_seed=42
-        )
-        assert var1 == var2, "Same seed should produce identical VaR"
+    @pytest.mark.parametrize("fn", [calculate_portfolio_var, calculate_expected_shortfall])
+    def test_deterministic_seed(self, simple_returns, equal_weights, fn):
+        """Test that random seed produces reproducible VaR and ES."""
+        kwargs = dict(confidence_level=0.95, n_simulations=100, random_seed=42)
+        result1 = fn(simple_returns, equal_weights, **kwargs)
+        # A copy of the frame misses the seeded-simulation cache, so this re-runs the draw
+        result2 = fn(simple_returns.copy(), equal_weights, **kwargs)
+        assert result1 == result2, "Same seed should produce identical results"
 
     def test_var_confidence_levels(self, simple_returns, equal_weights):
         """Test that higher confidence levels produce more conservative VaR."""
@@ -133,7 +162,7 @@ class TestCalculatePortfolioVar:
         """Test VaR calculation with single asset portfolio."""
         single_weight = pd.Series({"AAPL": 1.0})
         var = calculate_portfolio_var(
-            simple_returns, single_weight, confidence_level=0.95, random_seed=42
+            simple_returns, single_weight, confidence_level=0.95, n_simulations=100, random_seed=42
         )
         assert isinstance(var, float)
         assert var < 0
@@ -145,7 +174,7 @@ class TestCalculateExpectedShortfall:
     def test_es_basic_calculation(self, simple_returns, equal_weights):
         """Test basic ES calculation returns negative value."""
         es = calculate_expected_shortfall(
-            simple_returns, equal_weights, confidence_level=0.95, n_simulations=1000
+            simple_returns, equal_weights, confidence_level=0.95, n_simulations=100
         )
         assert isinstance(es, float)
         assert es < 0, "ES should be negative (representing a loss)"
@@ -160,15 +189,123 @@ class TestCalculateExpectedShortfall:
         )
         assert es <= var, "Expected Shortfall should be more conservative than VaR"
 
-    def test_es_deterministic_seed(self, simple_returns, equal_weights):
-        """Test that random seed produces reproducible results."""
-        es1 = calculate_expected_shortfall(
+    def test_fused_var_and_es_match_wrappers(self, simple_returns, equal_weights):
+        """Test the fused VaR/ES kernel agrees with the single-measure functions."""
+        var, es = calculate_var_and_es(
+            simple_returns, equal_weights, confidence_level=0.95, random_seed=42
+        )
+        assert var == calculate_portfolio_var(
             simple_returns, equal_weights, confidence_level=0.95, random_seed=42
         )
-        es2 = calculate_expected_shortfall(
+        assert es == calculate_expected_shortfall(
             simple_returns, equal_weights, confidence_level=0.95, random_seed=42
         )
-        assert es1 == es2, "Same seed should produce identical ES"
+        assert es <= var
+
+    @pytest.mark.parametrize("sampling", ["stratified", "antithetic"])
+    def test_variance_reduced_sampling(self, simple_returns, equal_weights, sampling):
+        """Test variance-reduced sampling is reproducible and keeps ES at or below VaR."""
+        var, es = calculate_var_and_es(
+            simple_returns, equal_weights, random_seed=42, sampling=sampling
+        )
+        assert (var, es) == calculate_var_and_es(
+            simple_returns, equal_weights, random_seed=42, sampling=sampling
+        )
+        assert es <= var < 0
+
+    def test_var_calculator_matches_function(self, simple_returns, equal_weights):
+        """Test the reusable calculator reproduces the fused function across calls."""
+        calculator = VaRCalculator(simple_returns, equal_weights)
+        for confidence_level in (0.95, 0.99):
+            assert calculator.var_and_es(confidence_level, random_seed=42) == calculate_var_and_es(
+                simple_returns, equal_weights, confidence_level=confidence_level, random_seed=42
+            )
+        assert calculator.volatility() == pytest.approx(
+            calculate_portfolio_volatility(simple_returns, equal_weights), rel=1e-5
+        )
+
+    def test_batch_matches_single_portfolio(self, simple_returns, equal_weights):
+        """Test batch VaR/ES columns match per-portfolio calculations with the same seed."""
+        weights_matrix = pd.DataFrame(
+            {"EQ": equal_weights, "TILT": pd.Series({"AAPL": 0.6, "MSFT": 0.3, "GOOGL": 0.1})}
+        )
+        batch = calculate_portfolio_var_batch(
+            simple_returns, weights_matrix, confidence_levels=(0.95, 0.99), random_seed=42
+        )
+        for portfolio_id, weights in weights_matrix.items():
+            for confidence_level, label in ((0.95, "95"), (0.99, "99")):
+                var, es = calculate_var_and_es(
+                    simple_returns, weights, confidence_level=confidence_level, random_seed=42
+                )
+                assert batch.loc[portfolio_id, f"VaR_{label}"] == pytest.approx(var)
+                assert batch.loc[portfolio_id, f"ES_{label}"] == pytest.approx(es)
+
+    def test_parametric_var_matches_normal_quantile(
+        self, simple_returns, equal_weights, portfolio_returns
+    ):
+        """Test parametric VaR converges to the normal quantile of the portfolio returns."""
+        expected = portfolio_returns.mean() - 1.6448536 * portfolio_returns.std(ddof=1)
+        var, es = calculate_var_and_es(
+            simple_returns,
+            equal_weights,
+            n_simulations=100_000,
+            random_seed=42,
+            method="parametric",
+        )
+        assert var == pytest.approx(expected, rel=0.02)
+        assert es < var
+
+    @pytest.mark.parametrize("method", ["historical", "parametric"])
+    def test_chunked_simulation_matches_single_pass(self, simple_returns, equal_weights, method):
+        """Test streaming the simulation in chunks keeps the same tail as one draw."""
+        kwargs = dict(n_simulations=5000, random_seed=42, method=method)
+        var, es = calculate_var_and_es(simple_returns, equal_weights, **kwargs)
+        chunked_var, chunked_es = calculate_var_and_es(
+            simple_returns, equal_weights, chunk_size=1024, **kwargs
+        )
+        assert chunked_var == var
+        assert chunked_es == pytest.approx(es)
+
+    @pytest.mark.slow
+    def test_full_simulation_end_to_end(self, simple_returns, equal_weights):
+        """Test VaR/ES at the default 1000 simulations keep their sign and ordering."""
+        var, es = calculate_var_and_es(
+            simple_returns, equal_weights, confidence_level=0.95, n_simulations=1000
+        )
+        assert es <= var < 0
+
+    def test_seeded_cache_sees_in_place_edits(self, simple_returns, equal_weights):
+        """Test seeded VaR is recomputed after the returns frame is edited in place."""
+        returns = simple_returns.copy()
+        calculate_portfolio_var(returns, equal_weights, n_simulations=100, random_seed=1)
+        returns.iloc[:, :] = returns.to_numpy() * 10
+        assert calculate_portfolio_var(
+            returns, equal_weights, n_simulations=100, random_seed=1
+        ) == calculate_portfolio_var(
+            returns.copy(), equal_weights, n_simulations=100, random_seed=1
+        )
+
+    def test_unknown_sampling_method(self, simple_returns, equal_weights):
+        """Test that an unknown sampling scheme raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown sampling method"):
+            calculate_var_and_es(simple_returns, equal_weights, sampling="sobol")
+
+
+class TestCalculateHistoricalVarAndEs:
+    """Tests for historical-simulation VaR and Expected Shortfall."""
+
+    def test_historical_var_and_es(self, portfolio_returns):
+        """Test historical VaR is the empirical percentile and ES is at least as severe."""
+        var, es = calculate_historical_var_and_es(
+            portfolio_returns.to_numpy(), confidence_level=0.95
+        )
+        assert var == pytest.approx(np.percentile(portfolio_returns, 5))
+        assert es <= var, "ES should be more conservative than VaR"
+
+    def test_historical_invalid_confidence(self):
+        """Test historical VaR with invalid confidence level."""
+        with pytest.raises(ValueError, match="Confidence level must be between 0 and 1"):
+            calculate_historical_var_and_es(np.array([0.01, -0.02]), confidence_level=1.5)
 
 
 class TestCalculatePortfolioVolatility:
@@ -180,12 +317,20 @@ class TestCalculatePortfolioVolatility:
         assert isinstance(vol, float)
         assert vol > 0, "Volatility should be positive"
 
+    def test_volatility_sees_in_place_edits(self, simple_returns, equal_weights):
+        """Test volatility reflects in-place edits of the returns frame."""
+        returns = simple_returns.copy()
+        calculate_portfolio_volatility(returns, equal_weights)
+        returns.iloc[:, :] = returns.to_numpy() * 10
+        assert calculate_portfolio_volatility(returns, equal_weights) == pytest.approx(
+            calculate_portfolio_volatility(returns.copy(), equal_weights)
+        )
+
     def test_volatility_zero_returns(self, equal_weights):
         """Test volatility with zero returns."""
-        dates = pd.date_range("2025-01-01", periods=100, freq="D")
+        zeros = np.zeros(100)
         zero_returns = pd.DataFrame(
-            {"AAPL": np.zeros(100), "MSFT": np.zeros(100), "GOOGL": np.zeros(100)},
-            index=dates,
+            {"AAPL": zeros, "MSFT": zeros, "GOOGL": zeros}, index=_DATES_100
         )
         vol = calculate_portfolio_volatility(zero_returns, equal_weights)
         assert vol == 0.0, "Volatility of zero returns should be zero"
@@ -199,30 +344,15 @@ class TestCalculateSharpeRatio:
         sharpe = calculate_sharpe_ratio(simple_returns, equal_weights, window=20)
         assert isinstance(sharpe, float)
 
-    def test_sharpe_insufficient_data(self, equal_weights):
-        """Test Sharpe ratio with insufficient data returns None."""
-        dates = pd.date_range("2025-01-01", periods=10, freq="D")
-        short_returns = pd.DataFrame(
-            {
-                "AAPL": np.random.randn(10),
-                "MSFT": np.random.randn(10),
-                "GOOGL": np.random.randn(10),
-            },
-            index=dates,
-        )
-        sharpe = calculate_sharpe_ratio(short_returns, equal_weights, window=20)
-        assert sharpe is None, "Should return None when insufficient data"
-
     def test_sharpe_positive_returns(self, equal_weights):
         """Test Sharpe ratio with consistently positive returns."""
-        dates = pd.date_range("2025-01-01", periods=50, freq="D")
         positive_returns = pd.DataFrame(
             {
-                "AAPL": np.random.RandomState(60).uniform(0.001, 0.01, 50),
-                "MSFT": np.random.RandomState(61).uniform(0.001, 0.01, 50),
-                "GOOGL": np.random.RandomState(62).uniform(0.001, 0.01, 50),
+                "AAPL": np.random.default_rng(60).random(50) * (0.01 - 0.001) + 0.001,
+                "MSFT": np.random.default_rng(61).random(50) * (0.01 - 0.001) + 0.001,
+                "GOOGL": np.random.default_rng(62).random(50) * (0.01 - 0.001) + 0.001,
             },
-            index=dates,
+            index=_DATES_50,
         )
         sharpe = calculate_sharpe_ratio(positive_returns, equal_weights, window=20)
         assert sharpe is not None
@@ -230,10 +360,9 @@ class TestCalculateSharpeRatio:
 
     def test_sharpe_zero_volatility(self, equal_weights):
         """Test Sharpe ratio with zero volatility returns None."""
-        dates = pd.date_range("2025-01-01", periods=50, freq="D")
+        constant = np.full(50, 0.01)
         constant_returns = pd.DataFrame(
-            {"AAPL": np.full(50, 0.01), "MSFT": np.full(50, 0.01), "GOOGL": np.full(50, 0.01)},
-            index=dates,
+            {"AAPL": constant, "MSFT": constant, "GOOGL": constant}, index=_DATES_50
         )
         sharpe = calculate_sharpe_ratio(constant_returns, equal_weights, window=20)
         assert sharpe is None, "Should return None when volatility is zero"
@@ -242,36 +371,27 @@ class TestCalculateSharpeRatio:
 class TestCalculateBeta:
     """Tests for beta calculation."""
 
-    def test_beta_basic_calculation(self, simple_returns, benchmark_returns, equal_weights):
+    def test_beta_basic_calculation(self, portfolio_returns, benchmark_returns):
         """Test basic beta calculation."""
-        portfolio_returns = simple_returns @ equal_weights.values
         beta = calculate_beta(portfolio_returns, benchmark_returns, window=20)
         assert isinstance(beta, float)
 
-    def test_beta_insufficient_data(self, benchmark_returns, equal_weights):
+    def test_beta_insufficient_data(self, short_returns, benchmark_returns, equal_weights):
         """Test beta with insufficient data returns None."""
-        dates = pd.date_range("2025-01-01", periods=10, freq="D")
-        short_returns = pd.DataFrame(
-            {
-                "AAPL": np.random.randn(10),
-                "MSFT": np.random.randn(10),
-                "GOOGL": np.random.randn(10),
-            },
-            index=dates,
-        )
         portfolio_returns = short_returns @ equal_weights.values
         beta = calculate_beta(portfolio_returns, benchmark_returns[:10], window=20)
         assert beta is None, "Should return None when insufficient data"
 
     def test_beta_perfect_correlation(self):
         """Test beta with perfect correlation to benchmark."""
-        dates = pd.date_range("2025-01-01", periods=50, freq="D")
-        benchmark = pd.Series(np.random.RandomState(70).randn(50), index=dates)
+        benchmark = pd.Series(np.random.default_rng(70).standard_normal(50), index=_DATES_50)
         portfolio = benchmark.copy()
 
         beta = calculate_beta(portfolio, benchmark, window=20)
         assert beta is not None
-        assert abs(beta - 1.0) < 0.1, "Beta should be close to 1.0 for perfect correlation"
+        assert beta == pytest.approx(
+            1.0, abs=0.1
+        ), "Beta should be close to 1.0 for perfect correlation"
 
 
 class TestCalculateBetaFromDataframes:
@@ -280,8 +400,8 @@ class TestCalculateBetaFromDataframes:
     def test_beta_from_dataframes(self, simple_returns, equal_weights):
         """Test beta calculation from DataFrame with benchmark column."""
         returns_with_bench = simple_returns.copy()
-        returns_with_bench["SPY"] = np.random.RandomState(80).normal(
-            0.0005, 0.015, len(simple_returns)
+        returns_with_bench["SPY"] = (
+            np.random.default_rng(80).standard_normal(len(simple_returns)) * 0.015 + 0.0005
         )
 
         beta = calculate_beta_from_dataframes(returns_with_bench, equal_weights, "SPY", window=20)
@@ -302,19 +422,41 @@ class TestCalculateRollingVolatility:
         assert isinstance(vol, float)
         assert vol > 0, "Volatility should be positive"
 
-    def test_rolling_volatility_insufficient_data(self, equal_weights):
-        """Test rolling volatility with insufficient data returns None."""
-        dates = pd.date_range("2025-01-01", periods=10, freq="D")
-        short_returns = pd.DataFrame(
-            {
-                "AAPL": np.random.randn(10),
-                "MSFT": np.random.randn(10),
-                "GOOGL": np.random.randn(10),
-            },
-            index=dates,
+
+class TestInsufficientData:
+    """Tests for window-based metrics on fewer rows than the window."""
+
+    @pytest.mark.parametrize("fn", [calculate_sharpe_ratio, calculate_rolling_volatility])
+    def test_returns_none(self, short_returns, equal_weights, fn):
+        """Test window-based metrics return None when data is shorter than the window."""
+        assert fn(short_returns, equal_weights, window=20) is None
+
+
+class TestMetricsFromPortfolioReturns:
+    """Tests for metrics computed from precomputed portfolio returns."""
+
+    def test_matches_dataframe_api(self, simple_returns, equal_weights, portfolio_returns):
+        """Test array-based metrics agree with the DataFrame-based functions."""
+        returns_array = portfolio_returns.to_numpy()
+
+        assert calculate_sharpe_ratio_from_returns(returns_array, window=20) == pytest.approx(
+            calculate_sharpe_ratio(simple_returns, equal_weights, window=20)
+        )
+        assert calculate_volatility_from_returns(returns_array, window=20) == pytest.approx(
+            calculate_rolling_volatility(simple_returns, equal_weights, window=20)
         )
-        vol = calculate_rolling_volatility(short_returns, equal_weights, window=20)
-        assert vol is None, "Should return None when insufficient data"
+
+    def test_beta_matches_series_api(self, portfolio_returns, benchmark_returns):
+        """Test array-based beta agrees with the Series-based rolling beta."""
+        assert calculate_beta_from_returns(
+            portfolio_returns.to_numpy(), benchmark_returns.to_numpy(), window=20
+        ) == pytest.approx(calculate_beta(portfolio_returns, benchmark_returns, window=20))
+
+    def test_insufficient_data(self):
+        """Test array-based metrics return None when shorter than the window."""
+        short_returns = np.random.default_rng(90).standard_normal(10) * 0.01
+        assert calculate_sharpe_ratio_from_returns(short_returns, window=20) is None
+        assert calculate_volatility_from_returns(short_returns, window=20) is None
 
 
 if __name__ == "__main__":